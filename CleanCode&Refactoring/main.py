@@ -9,8 +9,35 @@
 # - DRY (Don't Repeat Yourself)
 # - KISS (Keep It Simple, Stupid)
 # - YAGNI (You Ain’t Gonna Need It)
+#
+# And then, the same small functions at scale:
+# - Bulk email sending
+# - Bulk user import
+# - Batched payment settlement
+# - Column-wise math with NumPy
 # ============================================================
 
+import itertools
+import json
+import math
+import os
+import queue
+import smtplib
+import socket
+import socketserver
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+from time import perf_counter, sleep
+
+try:
+    import numpy as np
+except ImportError:  # only the column-wise versions need NumPy
+    np = None
+
 
 # ============================================================
 # 1️⃣ Naming — Use meaningful, descriptive names
@@ -151,6 +178,724 @@ report = SimpleReport()
 report.generate("Sales data")
 
 
+# ============================================================
+# 7️⃣ At Scale — Bulk email with pooled connections
+# ------------------------------------------------------------
+# send_welcome_email() implies one SMTP connection per message; during a
+# sign-up burst the connect + handshake is most of the cost. Keep a few
+# connections open, send many messages per session, and queue the work.
+# ============================================================
+
+# Local SMTP stand-in: counts messages and sessions, handshake_delay simulates TLS/AUTH cost
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, handshake_delay=0.01):
+        super().__init__((host, port), LocalSMTPHandler)
+        self.handshake_delay = handshake_delay
+        self.messages = 0
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+class LocalSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        with self.server.lock:
+            self.server.sessions += 1
+        sleep(self.server.handshake_delay)
+        self.reply("220 localhost stand-in SMTP ready")
+        for line in self.rfile:
+            verb = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+            if verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                for data_line in self.rfile:
+                    if data_line == b".\r\n":
+                        break
+                with self.server.lock:
+                    self.server.messages += 1
+                self.reply("250 OK: queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            elif verb in ("EHLO", "HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPConnectionPool:
+    def __init__(self, host="localhost", port=25, max_size=4, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.opened = 0  # connections created over the pool's lifetime
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                smtp = None
+            if smtp is not None and not self._alive(smtp):
+                smtp.close()  # the server dropped the idle session: replace it
+                smtp = None
+            if smtp is None:
+                smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+                self.opened += 1
+            try:
+                yield smtp
+            except BaseException:
+                smtp.close()  # the session may be mid-command: don't give it back
+                raise
+            self._idle.put(smtp)
+
+    @staticmethod
+    def _alive(smtp):
+        # one NOOP round trip per checkout (i.e. per batch), not per message
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self):
+        while True:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                smtp.quit()
+            except smtplib.SMTPException:
+                smtp.close()
+
+
+class EmailQueue:
+    """Background sender: submit() queues a message, workers send them in batches.
+
+    The queue is bounded, so a burst bigger than max_queued makes submit()
+    wait (backpressure) instead of piling messages up in memory.
+    """
+
+    def __init__(self, pool, workers=4, batch_size=50, max_queued=1000):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.sent = 0
+        self.failed = []  # (message, error)
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._started = perf_counter()
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, message, timeout=None):
+        self._queue.put(message, timeout=timeout)  # blocks while the queue is full
+
+    def close(self):
+        """Send everything still queued, then stop the workers."""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def metrics(self):
+        elapsed = perf_counter() - self._started
+        return {
+            "sent": self.sent,
+            "failed": len(self.failed),
+            "batches": self.batches,
+            "connections": self.pool.opened,
+            "queued": self._queue.qsize(),
+            "messages_per_second": round(self.sent / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _work(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            batch = [message]
+            while len(batch) < self.batch_size:  # take whatever else is already waiting
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    self._queue.put(None)  # leave the stop signal for after this batch
+                    break
+                batch.append(message)
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        sent, failed = 0, []
+        try:
+            with self.pool.connection() as smtp:  # one session for the whole batch
+                for message in batch:
+                    try:
+                        smtp.send_message(message)
+                        sent += 1
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as exc:
+                        failed.append((message, exc))  # this message only; the session is still usable
+        except (smtplib.SMTPException, OSError) as exc:
+            failed.extend((message, exc) for message in batch[sent + len(failed):])
+        with self._lock:
+            self.sent += sent
+            self.failed.extend(failed)
+            self.batches += 1
+
+
+def welcome_email(data):
+    message = EmailMessage()
+    message["From"] = "welcome@example.com"
+    message["To"] = data["email"]
+    message["Subject"] = "Welcome!"
+    message.set_content(f"Hi {data.get('name', 'there')}, thanks for signing up.")
+    return message
+
+# Usage Example — a sign-up burst of welcome emails
+signups = [{"email": f"user{i}@example.com", "name": f"User {i}"} for i in range(200)]
+with LocalSMTPServer(handshake_delay=0.01) as smtp_server:
+    sample = signups[:50]  # the slow way only needs a sample for its rate
+    started = perf_counter()
+    for user in sample:  # ❌ one connection per message
+        with smtplib.SMTP("127.0.0.1", smtp_server.port) as smtp:
+            smtp.send_message(welcome_email(user))
+    print(f"One connection per email: {len(sample) / (perf_counter() - started):.0f} emails/s")
+
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, max_size=4)
+    email_queue = EmailQueue(pool, workers=4, batch_size=50, max_queued=100)
+    for user in signups:  # ✅ pooled connections, batched sessions
+        email_queue.submit(welcome_email(user))
+    email_queue.close()
+    pool.close()
+    print("Pooled + batched:", email_queue.metrics())
+
+
+# ============================================================
+# 8️⃣ At Scale — Bulk user import
+# ------------------------------------------------------------
+# process_user_refactored() handles one user at a time. For a bulk import
+# the same three steps become a streaming pipeline:
+#   1. read + validate JSONL in chunks (bad records go to a reject file)
+#   2. save each chunk in one sqlite transaction with executemany()
+#   3. queue welcome emails for the new users on the EmailQueue
+# Stages run in their own threads, connected by small bounded queues.
+# ============================================================
+
+def read_user_chunks(jsonl_path, chunk_size=10_000):
+    # raw bytes: a line that isn't valid UTF-8 is rejected by the validator, not fatal here
+    chunk = []
+    with open(jsonl_path, "rb") as source:
+        for line_number, line in enumerate(source, 1):
+            if line.strip():
+                chunk.append((line_number, line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def validate_user_chunk(chunk, rejects):
+    valid = []
+    for line_number, line in chunk:
+        try:
+            data = json.loads(line.decode("utf-8"))
+            if not isinstance(data, dict):
+                raise ValueError("Record is not a JSON object")
+            validate_user(data)
+            if not isinstance(data["email"], str):
+                raise ValueError("Email is not a string")
+            if not isinstance(data.get("name"), (str, type(None))):
+                raise ValueError("Name is not a string")
+            for value in (data["email"], data.get("name") or ""):
+                value.encode("utf-8")  # lone surrogates from \ud800-style escapes can't be stored
+        except (ValueError, RecursionError) as exc:  # malformed JSON or UTF-8, absurd nesting, bad strings
+            record = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            rejects.write(json.dumps({"line": line_number, "error": str(exc) or type(exc).__name__,
+                                      "record": record}) + "\n")
+        else:
+            valid.append(data)
+    return valid
+
+ROW_ERRORS = (sqlite3.InterfaceError, sqlite3.ProgrammingError, ValueError)  # sqlite refused one row's values
+
+def save_users_to_db_batch(db, users):
+    """Insert a chunk in one transaction.
+
+    Returns (users that were new, [(user, error)] for rows sqlite couldn't store).
+    """
+    insert = "INSERT OR IGNORE INTO users (email, name) VALUES (?, ?)"
+    rows = [(user["email"], user.get("name")) for user in users]
+    rejected = []
+    last_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]
+    try:
+        with db:
+            db.executemany(insert, rows)
+    except ROW_ERRORS:
+        # the chunk was rolled back; retry it row by row so one bad row doesn't sink the rest
+        with db:
+            for user, row in zip(users, rows):
+                try:
+                    db.execute(insert, row)
+                except ROW_ERRORS as exc:
+                    rejected.append((user, exc))
+    # ids only grow, so anything above last_id was inserted just now (duplicates were skipped)
+    new_users = [{"email": email, "name": name} for email, name in
+                 db.execute("SELECT email, name FROM users WHERE id > ? ORDER BY id", (last_id,))]
+    return new_users, rejected
+
+def import_users(jsonl_path, db_path, reject_path, chunk_size=10_000, email_queue=None):
+    stats = {"read": 0, "saved": 0, "duplicates": 0, "rejected": 0, "emails_queued": 0}
+    errors = []
+    to_db, to_mail = queue.Queue(maxsize=4), queue.Queue(maxsize=4)
+    rejects_lock = threading.Lock()  # the reader and the db stage both write rejects
+
+    def db_stage():
+        db = sqlite3.connect(db_path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, email TEXT NOT NULL UNIQUE, name TEXT)")
+        try:
+            for users in iter(to_db.get, None):
+                if errors:
+                    continue  # keep draining so the reader never blocks
+                try:
+                    new_users, rejected = save_users_to_db_batch(db, users)
+                except Exception as exc:
+                    errors.append(exc)
+                    continue
+                if rejected:
+                    with rejects_lock:
+                        for user, exc in rejected:
+                            rejects.write(json.dumps({"line": None, "error": str(exc), "record": user}) + "\n")
+                        stats["rejected"] += len(rejected)
+                stats["saved"] += len(new_users)
+                stats["duplicates"] += len(users) - len(new_users) - len(rejected)
+                if email_queue is not None and new_users:
+                    to_mail.put(new_users)
+        finally:
+            db.close()
+            to_mail.put(None)
+
+    def mail_stage():
+        for users in iter(to_mail.get, None):
+            if errors:
+                continue  # keep draining so the db stage never blocks
+            try:
+                for user in users:
+                    email_queue.submit(welcome_email(user))  # waits if the mail queue is full
+                    stats["emails_queued"] += 1
+            except Exception as exc:
+                errors.append(exc)
+
+    with open(reject_path, "w", encoding="utf-8") as rejects:
+        stages = [threading.Thread(target=db_stage), threading.Thread(target=mail_stage)]
+        for stage in stages:
+            stage.start()
+        try:
+            for chunk in read_user_chunks(jsonl_path, chunk_size):
+                with rejects_lock:
+                    valid = validate_user_chunk(chunk, rejects)
+                    stats["rejected"] += len(chunk) - len(valid)
+                stats["read"] += len(chunk)
+                if errors:
+                    break
+                to_db.put(valid)
+        finally:
+            to_db.put(None)
+            for stage in stages:
+                stage.join()
+    if errors:
+        raise errors[0]
+    return stats
+
+# Usage Example — 50,000 sign-ups with a few bad records mixed in
+def write_signups(path, count):
+    with open(path, "wb") as signups_file:
+        for i in range(count):
+            if i % 5000 == 1:
+                signups_file.write(b"{not json\n")
+            elif i % 5000 == 2:
+                signups_file.write(json.dumps({"name": f"User {i}"}).encode() + b"\n")  # missing email
+            elif i % 5000 == 3:
+                signups_file.write(json.dumps({"email": i, "name": f"User {i}"}).encode() + b"\n")  # not a string
+            elif i % 5000 == 4:
+                signups_file.write(b'{"email": "caf\xe9@example.com"}\n')  # Latin-1, not UTF-8
+            elif i % 5000 == 5:
+                signups_file.write(b"[" * 100_000 + b"\n")  # nested too deep for the parser
+            else:
+                record = {"email": f"user{i % 49_000}@example.com", "name": f"User {i}"}
+                signups_file.write(json.dumps(record).encode() + b"\n")
+
+with tempfile.TemporaryDirectory() as workdir:
+    signups_path = os.path.join(workdir, "signups.jsonl")
+    write_signups(signups_path, 50_000)
+    started = perf_counter()
+    stats = import_users(signups_path, os.path.join(workdir, "users.db"), os.path.join(workdir, "rejects.jsonl"))
+    elapsed = perf_counter() - started
+    print(f"Imported in {elapsed:.1f}s ({stats['read'] / elapsed:.0f} users/s):", stats)
+
+    write_signups(signups_path, 200)
+    with LocalSMTPServer(handshake_delay=0.01) as smtp_server:
+        pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, max_size=4)
+        email_queue = EmailQueue(pool, batch_size=100)
+        stats = import_users(signups_path, os.path.join(workdir, "welcome.db"),
+                             os.path.join(workdir, "rejects.jsonl"), chunk_size=50, email_queue=email_queue)
+        email_queue.close()
+        pool.close()
+        print("With welcome emails:", stats, "— sent:", email_queue.metrics()["sent"])
+
+
+# ============================================================
+# 9️⃣ At Scale — Batched payment settlement
+# ------------------------------------------------------------
+# process_payment() "connects to the bank" for every single payment.
+# A gateway keeps a few bank sessions open and settles payments in
+# batches, closing a batch when it is full or its time window runs out.
+# ============================================================
+
+# Local simulated bank. Line protocol:
+#   server: HELLO            (after handshake_delay — the expensive part of connecting)
+#   client: SETTLE <n>, then n lines "<payment id> <method> <amount>"
+#   server: n lines "<payment id> OK" or "<payment id> DECLINED <reason>"
+class LocalBankServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, handshake_delay=0.02, batch_delay=0.005, limit=10_000):
+        super().__init__((host, port), LocalBankHandler)
+        self.handshake_delay = handshake_delay
+        self.batch_delay = batch_delay  # fixed cost of one settlement round trip
+        self.limit = limit
+        self.sessions = 0
+        self.batches = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+class LocalBankHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with self.server.lock:
+            self.server.sessions += 1
+        sleep(self.server.handshake_delay)
+        self.wfile.write(b"HELLO\n")
+        for line in self.rfile:
+            command = line.decode().split()
+            if not command or command[0] != "SETTLE":
+                return
+            payments = [self.rfile.readline().decode().split() for _ in range(int(command[1]))]
+            sleep(self.server.batch_delay)
+            replies = []
+            for payment_id, method, amount in payments:
+                if not 0 < float(amount) <= self.server.limit:
+                    replies.append(f"{payment_id} DECLINED amount {amount} out of range\n")
+                else:
+                    replies.append(f"{payment_id} OK\n")
+            self.wfile.write("".join(replies).encode())
+            with self.server.lock:
+                self.server.batches += 1
+
+
+class BankSession:
+    def __init__(self, host, port, timeout=10):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._socket.makefile("rwb")
+        if self._file.readline() != b"HELLO\n":
+            raise ConnectionError("bank did not greet us")
+
+    @staticmethod
+    def check_payment(method, amount):
+        # fields are space/newline separated on the wire: a space would shift them,
+        # a newline would inject a line of its own
+        if not isinstance(method, str) or not method or method.split() != [method]:
+            raise ValueError(f"payment method must be one word without whitespace, got {method!r}")
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount):
+            raise ValueError(f"payment amount must be a finite number, got {amount!r}")
+
+    def settle(self, payments):
+        """Settle [(payment_id, method, amount), ...]; returns {payment_id: error or None}."""
+        for _, method, amount in payments:
+            self.check_payment(method, amount)
+        lines = [f"SETTLE {len(payments)}\n"] + [f"{pid} {method} {amount}\n" for pid, method, amount in payments]
+        self._file.write("".join(lines).encode())
+        self._file.flush()
+        results = {}
+        for _ in payments:
+            payment_id, status, *reason = self._file.readline().decode().split(" ", 2)
+            results[int(payment_id)] = None if status.strip() == "OK" else " ".join(reason).strip()
+        return results
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+class BankSessionPool:
+    def __init__(self, host, port, max_size=4):
+        self.host = host
+        self.port = port
+        self.opened = 0  # handshakes paid over the pool's lifetime
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = queue.LifoQueue()
+
+    @contextmanager
+    def session(self):
+        with self._slots:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                session = BankSession(self.host, self.port)
+                self.opened += 1
+            try:
+                yield session
+            except BaseException:
+                session.close()  # a half-finished exchange leaves the session unusable
+                raise
+            self._idle.put(session)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class PaymentDeclined(Exception):
+    pass
+
+class PaymentGateway:
+    """submit() returns a Future; a batcher groups payments by size or time window."""
+
+    def __init__(self, pool, max_batch_size=100, max_wait=0.02, max_batches_in_flight=4):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait  # seconds the first payment of a batch waits for company
+        self.batch_latencies = []  # seconds per settlement round trip
+        self.settled = 0
+        self._lock = threading.Lock()  # batches finish on several sender threads
+        self._closed = False
+        self._ids = itertools.count(1)
+        self._pending = queue.Queue()
+        self._senders = ThreadPoolExecutor(max_workers=max_batches_in_flight)
+        self._started = perf_counter()
+        self._batcher = threading.Thread(target=self._collect, daemon=True)
+        self._batcher.start()
+
+    def submit(self, method, amount):
+        BankSession.check_payment(method, amount)  # raise here, not fail the whole batch later
+        future = Future()
+        with self._lock:  # no payment may slip in behind close()'s stop signal
+            if self._closed:
+                raise RuntimeError("PaymentGateway is closed")
+            self._pending.put((next(self._ids), method, amount, future))
+        return future
+
+    def pay(self, method, amount):
+        return self.submit(method, amount).result()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.put(None)
+        self._batcher.join()
+        self._senders.shutdown(wait=True)
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self.batch_latencies)
+        elapsed = perf_counter() - self._started
+        return {
+            "settled": self.settled,
+            "batches": len(latencies),
+            "sessions": self.pool.opened,
+            "avg_batch_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+            "p95_batch_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else 0.0,
+            "payments_per_second": round(self.settled / elapsed, 1),
+        }
+
+    def _collect(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch, deadline = [item], perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._pending.get(timeout=max(0.0, deadline - perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)  # stop after sending this batch
+                    break
+                batch.append(item)
+            self._senders.submit(self._settle, batch)
+
+    def _settle(self, batch):
+        started = perf_counter()
+        try:
+            with self.pool.session() as session:
+                results = session.settle([(pid, method, amount) for pid, method, amount, _ in batch])
+        except Exception as exc:
+            for *_, future in batch:
+                future.set_exception(exc)
+            return
+        settled = sum(1 for pid, *_ in batch if results.get(pid, "no reply") is None)
+        with self._lock:
+            self.batch_latencies.append(perf_counter() - started)
+            self.settled += settled
+        for pid, method, amount, future in batch:
+            error = results.get(pid, "no reply from bank")
+            if error is None:
+                future.set_result(pid)
+            else:
+                future.set_exception(PaymentDeclined(f"{method} payment of {amount}: {error}"))
+
+# Usage Example
+with LocalBankServer() as bank:
+    started = perf_counter()
+    for amount in range(1, 51):  # ❌ one handshake per payment
+        one_off = BankSession("127.0.0.1", bank.port)
+        one_off.settle([(amount, "credit", amount)])
+        one_off.close()
+    print(f"One session per payment: {50 / (perf_counter() - started):.0f} payments/s")
+
+    bank_pool = BankSessionPool("127.0.0.1", bank.port, max_size=4)
+    gateway = PaymentGateway(bank_pool, max_batch_size=200, max_wait=0.01)
+    with ThreadPoolExecutor(max_workers=32) as shoppers:  # many concurrent checkouts
+        futures = list(shoppers.map(lambda i: gateway.submit("paypal" if i % 2 else "credit", i % 12_000),
+                                    range(5_000)))
+    declined = sum(1 for future in futures if future.exception() is not None)
+    gateway.close()
+    bank_pool.close()
+    print(f"Pooled + batched ({declined} declined):", gateway.metrics())
+    try:
+        gateway.submit("credit", 10)
+    except RuntimeError as exc:
+        print("Submit after close:", exc)  # ✅ rejected, not a Future that never resolves
+    try:
+        gateway.submit("credit card\nSETTLE 1", 20)
+    except ValueError as exc:
+        print("Malformed payment:", exc)  # ✅ rejected before it can break a batch
+
+
+# ============================================================
+# 🔟 At Scale — Column-wise math with NumPy
+# ------------------------------------------------------------
+# A pricing job calling calculate_discount() in a Python loop over tens of
+# millions of rows spends its time in the loop, not the math. The array
+# versions below do the same arithmetic, in the same order, on whole columns —
+# so they return exactly what the scalar functions return.
+# ============================================================
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the array versions need NumPy: pip install numpy")
+
+def _vip_mask(customer_types, categories=None):
+    """Boolean VIP mask from a bool mask, an array of labels, or integer category codes."""
+    customer_types = np.asarray(customer_types)
+    if customer_types.dtype == bool:
+        return customer_types
+    if categories is not None:  # integer codes into a list of labels
+        categories = list(categories)
+        if "VIP" not in categories:  # like the scalar version: nobody is VIP
+            return np.zeros(customer_types.shape, dtype=bool)
+        return customer_types == categories.index("VIP")
+    return customer_types == "VIP"
+
+def calculate_discount_array(prices, customer_types, categories=None):
+    """
+    Column version of calculate_discount().
+    VIP customers get 20%, regular get 10%.
+    """
+    _require_numpy()
+    discount_rate = np.where(_vip_mask(customer_types, categories), 0.2, 0.1)
+    return np.asarray(prices) * (1 - discount_rate)
+
+def calculate_triangle_area_array(base, height):
+    """Column version of calculate_triangle_area()."""
+    _require_numpy()
+    return np.asarray(base) * np.asarray(height) / 2
+
+def calculate_discount_file(prices_path, vip_path, output_path, chunk_rows=1_000_000, price_dtype="float64"):
+    """Discount a memory-mapped column of prices chunk by chunk, writing a float64 column.
+
+    prices_path holds raw price_dtype values, vip_path one byte (0/1) per row.
+    Only one chunk is in memory at a time, whatever the file size.
+    """
+    _require_numpy()
+    prices = np.memmap(prices_path, dtype=price_dtype, mode="r")
+    vip = np.memmap(vip_path, dtype=bool, mode="r", shape=prices.shape)
+    output = np.memmap(output_path, dtype="float64", mode="w+", shape=prices.shape)
+    for start in range(0, len(prices), chunk_rows):
+        end = start + chunk_rows
+        output[start:end] = calculate_discount_array(prices[start:end], vip[start:end])
+    output.flush()
+    return len(prices)
+
+# Usage Example
+if np is not None:
+    rng = np.random.default_rng(0)
+    prices = np.round(rng.uniform(1, 1000, 200_000), 2)
+    labels = np.where(rng.random(len(prices)) < 0.3, "VIP", "regular")
+
+    started = perf_counter()
+    scalar = [calculate_discount(price, customer_type) for price, customer_type in zip(prices.tolist(), labels.tolist())]
+    scalar_time = perf_counter() - started
+    started = perf_counter()
+    vectorized = calculate_discount_array(prices, labels)
+    vector_time = perf_counter() - started
+    assert vectorized.tolist() == scalar  # ✅ exactly the same floats
+    print(f"calculate_discount: loop {scalar_time:.2f}s, array {vector_time:.3f}s for {len(prices):,} rows")
+
+    codes = (labels == "VIP").astype(np.int8)  # categorical: 0 = regular, 1 = VIP
+    assert calculate_discount_array(prices, codes, categories=["regular", "VIP"]).tolist() == scalar
+    bases, heights = rng.integers(1, 100, 1000), rng.uniform(0.5, 50, 1000)
+    assert calculate_triangle_area_array(bases, heights).tolist() == [
+        calculate_triangle_area(b, h) for b, h in zip(bases.tolist(), heights.tolist())]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        prices_path, vip_path = os.path.join(workdir, "prices.f64"), os.path.join(workdir, "vip.bool")
+        prices.tofile(prices_path)
+        (labels == "VIP").tofile(vip_path)
+        started = perf_counter()
+        rows = calculate_discount_file(prices_path, vip_path, os.path.join(workdir, "discounted.f64"), chunk_rows=50_000)
+        print(f"Memory-mapped file: {rows:,} rows in {perf_counter() - started:.3f}s")
+        assert np.fromfile(os.path.join(workdir, "discounted.f64")).tolist() == scalar
+else:
+    print("NumPy is not installed — skipping the column-wise examples")
+
+
 # ============================================================
 # ✅ Summary
 # ------------------------------------------------------------
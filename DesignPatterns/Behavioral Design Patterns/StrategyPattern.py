@@ -6,10 +6,42 @@
 # رفتارها رو در کلاس‌های جدا تعریف کن و در زمان اجرا تصمیم بگیر از کدوم استفاده بشه.
 # ============================================================
 
+import random
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import monotonic, perf_counter, sleep
+
+class PaymentResult:
+    def __init__(self, amount, strategy, ok, error=None):
+        self.amount = amount
+        self.strategy = strategy
+        self.ok = ok
+        self.error = error
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error!r}"
+        return f"PaymentResult({self.amount}$ via {type(self.strategy).__name__}, {status})"
+
 class PaymentStrategy:
+    io_bound = False  # True if pay() mostly waits on the network — batches then run concurrently
+    idempotent = False  # True if paying the same order twice charges it once — required for hedging
+
     def pay(self, amount):
         pass
 
+    def pay_batch(self, amounts):
+        # Default: one pay() per amount. Override when the backend has a real bulk API.
+        # A failed payment is reported in its result and doesn't stop the rest.
+        results = []
+        for amount in amounts:
+            try:
+                self.pay(amount)
+                results.append(PaymentResult(amount, self, True))
+            except Exception as exc:
+                results.append(PaymentResult(amount, self, False, exc))
+        return results
+
 class PayPalPayment(PaymentStrategy):
     def pay(self, amount):
         print(f"Paying {amount}$ using PayPal.")
@@ -30,9 +62,257 @@ class ShoppingCart:
     def checkout(self, amount):
         self.payment_strategy.pay(amount)
 
+    def checkout_many(self, orders, max_concurrency=8):
+        """Check out many orders and return one PaymentResult per order, in order.
+
+        Each order is an amount (paid with this cart's strategy) or a
+        (strategy, amount) pair. Orders are grouped by strategy and handed to
+        pay_batch(); io_bound strategies are split into up to max_concurrency
+        batches that run on a thread pool.
+        """
+        groups = {}  # strategy -> [(position, amount), ...]
+        for position, order in enumerate(orders):
+            strategy, amount = order if isinstance(order, tuple) else (self.payment_strategy, order)
+            groups.setdefault(strategy, []).append((position, amount))
+
+        batches = []
+        for strategy, items in groups.items():
+            parts = max_concurrency if strategy.io_bound else 1
+            size = -(-len(items) // parts)  # ceil division
+            batches.extend((strategy, items[start:start + size]) for start in range(0, len(items), size))
+
+        results = [None] * sum(len(items) for items in groups.values())
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            futures = [
+                (strategy, items, pool.submit(strategy.pay_batch, [amount for _, amount in items])
+                 if strategy.io_bound else None)
+                for strategy, items in batches
+            ]
+            for strategy, items, future in futures:
+                amounts = [amount for _, amount in items]
+                try:
+                    batch_results = future.result() if future is not None else strategy.pay_batch(amounts)
+                except Exception as exc:  # the whole batch failed
+                    batch_results = [PaymentResult(amount, strategy, False, exc) for amount in amounts]
+                for (position, _), result in zip(items, batch_results):
+                    results[position] = result
+        return results
+
 # Usage Example
 cart1 = ShoppingCart(PayPalPayment())
 cart1.checkout(50)
 
 cart2 = ShoppingCart(BitcoinPayment())
-cart2.checkout(120)
\ No newline at end of file
+cart2.checkout(120)
+
+
+# Batched checkout — a settlement job paying many orders at once
+class GatewayPayment(PaymentStrategy):
+    io_bound = True
+
+    def __init__(self, name, latency=0.01, limit=1000):
+        self.name = name
+        self.latency = latency
+        self.limit = limit
+
+    def pay(self, amount):
+        sleep(self.latency)  # simulate a round trip to the payment provider
+        if amount > self.limit:
+            raise ValueError(f"{self.name} declined {amount}$ (limit {self.limit}$)")
+
+card_gateway = GatewayPayment("card gateway")
+wallet_gateway = GatewayPayment("wallet gateway", limit=200)
+settlement_cart = ShoppingCart(card_gateway)
+orders = [i if i % 3 else (wallet_gateway, i) for i in range(1, 301)]
+
+started = perf_counter()
+results = settlement_cart.checkout_many(orders, max_concurrency=16)
+elapsed = perf_counter() - started
+failed = [result for result in results if not result.ok]
+print(f"Checked out {len(results)} orders in {elapsed:.2f}s "
+      f"(serially: ~{len(results) * card_gateway.latency:.1f}s), {len(failed)} declined")
+print(failed[0])
+
+
+# ============================================================
+# 🧩 Adaptive Strategy
+# Instead of fixing one strategy up front, the context measures every
+# equivalent strategy and picks the fastest healthy one for each call.
+# Slow calls are hedged: if the chosen strategy hasn't answered by its usual
+# p95 latency, the next best one is tried in parallel and the first success wins.
+# به جای انتخاب ثابت، context خودش سریع‌ترین استراتژی سالم رو بر اساس آمار اخیر انتخاب می‌کنه.
+#
+# ⚠️ A hedged payment may run on two backends and the losing call isn't cancelled,
+# so hedging is off by default, and even with hedge=True only strategies that
+# declare idempotent = True (e.g. they send an idempotency key) are hedged.
+# ============================================================
+
+class StrategyHealth:
+    def __init__(self, window=100):
+        self.latencies = deque(maxlen=window)  # seconds, successful calls only
+        self.outcomes = deque(maxlen=window)  # True = success
+        self.calls = 0
+        self.last_call = 0.0
+
+    def record(self, latency, ok):
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    @property
+    def error_rate(self):
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def __str__(self):
+        return (f"calls={self.calls}, p50={self.percentile(50) * 1000:.1f}ms, "
+                f"p95={self.percentile(95) * 1000:.1f}ms, errors={self.error_rate:.0%}")
+
+
+class AdaptiveShoppingCart:
+    def __init__(self, strategies=(), window=100, min_samples=5, max_error_rate=0.2,
+                 cooldown=1.0, hedge=False, hedge_after=None, max_workers=16):
+        self.window = window
+        self.min_samples = min_samples  # calls before a strategy's latency is trusted
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown  # seconds before an unhealthy strategy gets a probe call
+        self.hedge = hedge
+        self.hedge_after = hedge_after  # fixed hedge delay in seconds, None = primary's p95
+        self.health = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        for strategy in strategies:
+            self.register(strategy)
+
+    def register(self, strategy):
+        with self._lock:
+            self.health.setdefault(strategy, StrategyHealth(self.window))
+
+    def ranked(self):
+        """Strategies in the order they should be tried for the next call."""
+        now = monotonic()
+        with self._lock:
+            def rank(item):
+                strategy, health = item
+                if len(health.outcomes) < self.min_samples:
+                    return (0, health.calls)  # still learning: sample it
+                if health.error_rate > self.max_error_rate:
+                    probing = now - health.last_call >= self.cooldown
+                    return (1 if probing else 3, health.last_call)
+                return (2, health.percentile(50))
+            return [strategy for strategy, _ in sorted(self.health.items(), key=rank)]
+
+    def checkout(self, amount):
+        candidates = self.ranked()
+        if not candidates:
+            raise RuntimeError("no payment strategy registered")
+        pending = {}  # future -> strategy
+        errors = []
+        while candidates or pending:
+            if candidates and (not pending or self._should_hedge(pending, candidates)):
+                strategy = candidates.pop(0)
+                pending[self._pool.submit(self._timed_pay, strategy, amount)] = strategy
+            hedging_possible = candidates and self._should_hedge(pending, candidates)
+            timeout = self._hedge_delay(next(iter(pending.values()))) if hedging_possible else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                strategy = pending.pop(future)
+                if future.exception() is None:
+                    return PaymentResult(amount, strategy, True)  # first success wins
+                errors.append(future.exception())
+            if done and not pending:
+                continue  # everything in flight failed: fail over to the next candidate
+        return PaymentResult(amount, None, False, errors[-1])
+
+    def _should_hedge(self, pending, candidates):
+        # both the call in flight and the one that would race it must be safe to run twice
+        return (self.hedge and len(pending) == 1 and candidates[0].idempotent
+                and all(strategy.idempotent for strategy in pending.values()))
+
+    def _hedge_delay(self, strategy):
+        if self.hedge_after is not None:
+            return self.hedge_after
+        with self._lock:
+            health = self.health[strategy]
+            return health.percentile(95) if len(health.latencies) >= self.min_samples else None
+
+    def _timed_pay(self, strategy, amount):
+        with self._lock:
+            self.health[strategy].last_call = monotonic()
+        started = perf_counter()
+        try:
+            strategy.pay(amount)
+        except Exception:
+            with self._lock:
+                self.health[strategy].record(perf_counter() - started, False)
+            raise
+        with self._lock:
+            self.health[strategy].record(perf_counter() - started, True)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+# Simulated backend with a configurable latency distribution, for trying the adaptive cart.
+# With a shared `settled` set (a stand-in for the processor's idempotency keys; the demo
+# uses the amount as the order id) a repeated payment is a no-op, so it can be hedged.
+class SimulatedPayment(PaymentStrategy):
+    _settled_lock = threading.Lock()
+
+    def __init__(self, name, latency, error_rate=0.0, seed=None, settled=None):
+        self.name = name
+        self.latency = latency  # callable(rng) -> seconds
+        self.error_rate = error_rate
+        self.charges = 0  # payments this backend actually charged
+        self.idempotent = settled is not None
+        self._settled = settled
+        self._rng = random.Random(seed)
+
+    def pay(self, amount):
+        sleep(self.latency(self._rng))
+        if self._rng.random() < self.error_rate:
+            raise ConnectionError(f"{self.name} failed to charge {amount}$")
+        with SimulatedPayment._settled_lock:
+            if self._settled is not None:
+                if amount in self._settled:
+                    return  # already charged by another backend
+                self._settled.add(amount)
+            self.charges += 1
+
+    def __repr__(self):
+        return self.name
+
+
+# Usage Example
+def make_backends(settled=None):
+    return [
+        SimulatedPayment("flaky", lambda rng: rng.uniform(0.001, 0.003), error_rate=0.6, seed=1, settled=settled),
+        SimulatedPayment("steady", lambda rng: rng.gauss(0.010, 0.001), seed=2, settled=settled),
+        SimulatedPayment("spiky", lambda rng: 0.080 if rng.random() < 0.04 else 0.004, seed=3, settled=settled),
+        SimulatedPayment("slow", lambda rng: rng.uniform(0.030, 0.040), seed=4, settled=settled),
+    ]
+
+for label, backends, hedge_after in (
+    ("no hedging", make_backends(), None),
+    ("hedged after 15ms, idempotent backends", make_backends(settled=set()), 0.015),
+):
+    adaptive_cart = AdaptiveShoppingCart(backends, hedge=hedge_after is not None, hedge_after=hedge_after)
+    latencies = []
+    for amount in range(1, 201):
+        started = perf_counter()
+        result = adaptive_cart.checkout(amount)
+        latencies.append(perf_counter() - started)
+        assert result.ok, result
+    adaptive_cart.close()
+    assert sum(backend.charges for backend in backends) == 200  # ✅ every order charged exactly once
+    latencies.sort()
+    print(f"Adaptive cart, {label}: p50={latencies[100] * 1000:.1f}ms, p99={latencies[198] * 1000:.1f}ms "
+          f"(spiky alone: 80ms tail on 4% of calls)")
+    for backend, health in adaptive_cart.health.items():
+        print(f"  {backend}: {health}")
@@ -5,37 +5,244 @@
 # وقتی یه کلاس تعداد زیادی پارامتر داره یا ساختش چند مرحله‌ایه، از Builder استفاده کن.
 # ============================================================
 
+import csv
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+# Computer is compact and immutable: __slots__ instead of a per-instance __dict__,
+# and read-only properties — once built it can't change, only the builder assembles it.
+# وقتی میلیون‌ها شیء داریم، __slots__ حافظه‌ی هر شیء رو خیلی کم می‌کنه.
 class Computer:
-    def __init__(self):
-        self.cpu = None
-        self.gpu = None
-        self.ram = None
+    __slots__ = ("_cpu", "_gpu", "_ram")
+
+    def __init__(self, cpu=None, gpu=None, ram=None):
+        self._cpu = cpu
+        self._gpu = gpu
+        self._ram = ram
+
+    cpu = property(lambda self: self._cpu)
+    gpu = property(lambda self: self._gpu)
+    ram = property(lambda self: self._ram)
+
+    def __eq__(self, other):
+        if not isinstance(other, Computer):
+            return NotImplemented
+        return (self._cpu, self._gpu, self._ram) == (other._cpu, other._gpu, other._ram)
+
+    def __hash__(self):
+        return hash((self._cpu, self._gpu, self._ram))
 
     def __str__(self):
         return f"Computer(cpu={self.cpu}, gpu={self.gpu}, ram={self.ram})"
 
 
+def _intern(value):
+    # Component names repeat across millions of specs ("Intel i9", "64GB"),
+    # so every Computer points at one shared string instead of its own copy
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class ComputerBuilder:
     def __init__(self):
-        self.computer = Computer()
+        self.cpu = None
+        self.gpu = None
+        self.ram = None
 
     def add_cpu(self, cpu):
-        self.computer.cpu = cpu
+        self.cpu = _intern(cpu)
         return self  # allows chaining
 
     def add_gpu(self, gpu):
-        self.computer.gpu = gpu
+        self.gpu = _intern(gpu)
         return self
 
     def add_ram(self, ram):
-        self.computer.ram = ram
+        self.ram = _intern(ram)
         return self
 
     def build(self):
-        return self.computer
+        return Computer(self.cpu, self.gpu, self.ram)
+
+    def reset(self):
+        self.cpu = self.gpu = self.ram = None
+        return self
+
+
+# Streaming builders — one Computer per spec, produced lazily so a file of
+# millions of specs never has to fit in memory at once.
+def build_computer(spec):
+    return Computer(_intern(spec.get("cpu")), _intern(spec.get("gpu")), _intern(spec.get("ram")))
+
+def iter_computers_from_jsonl(path):
+    with open(path, encoding="utf-8") as specs:
+        for line in specs:
+            if line.strip():
+                yield build_computer(json.loads(line))
+
+def iter_computers_from_csv(path):
+    with open(path, newline="", encoding="utf-8") as specs:
+        for row in csv.DictReader(specs):  # header: cpu,gpu,ram
+            yield build_computer({key: value or None for key, value in row.items()})
+
+
+# Prototype registry + object pool
+# Most builds are one of a few standard configurations: register each finished
+# configuration once, then hand out the shared (immutable) instance or a clone.
+# برای پیکربندی‌های استاندارد، یک بار بساز و بعد همون رو (یا یک کپی) تحویل بده.
+class BuildStats:
+    def __init__(self):
+        self.requests = 0
+        self.reused = 0  # served without allocating
+        self.allocated = 0
+
+    @property
+    def hit_rate(self):
+        return self.reused / self.requests if self.requests else 0.0
+
+    def __str__(self):
+        return (f"BuildStats(requests={self.requests}, reused={self.reused}, "
+                f"allocated={self.allocated}, hit_rate={self.hit_rate:.0%})")
+
+
+class ComputerPrototypes:
+    def __init__(self):
+        self._prototypes = {}
+        self.stats = BuildStats()
+
+    def register(self, key, computer):
+        if isinstance(computer, ComputerBuilder):
+            computer = computer.build()
+        self._prototypes[key] = computer
+        return computer
+
+    def get(self, key):
+        """The shared instance — safe to hand out because Computer is immutable."""
+        computer = self._prototypes[key]
+        self.stats.requests += 1
+        self.stats.reused += 1
+        return computer
+
+    def clone(self, key, **overrides):
+        """A new Computer based on the prototype, with some parts swapped."""
+        prototype = self._prototypes[key]
+        self.stats.requests += 1
+        if not overrides:
+            self.stats.reused += 1
+            return prototype
+        self.stats.allocated += 1
+        parts = {"cpu": prototype.cpu, "gpu": prototype.gpu, "ram": prototype.ram}
+        parts.update({name: _intern(value) for name, value in overrides.items()})
+        return Computer(**parts)
+
+
+# Bounded pool of builders for the mutable, step-by-step part of a build:
+# acquire() hands out a clean builder, release() puts it back (up to max_size kept).
+class ComputerBuilderPool:
+    def __init__(self, max_size=16):
+        self.max_size = max_size
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = BuildStats()
+
+    def acquire(self):
+        with self._lock:
+            self.stats.requests += 1
+            if self._idle:
+                self.stats.reused += 1
+                return self._idle.pop()
+            self.stats.allocated += 1
+        return ComputerBuilder()
+
+    def release(self, builder):
+        builder.reset()
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(builder)
+
+    @contextmanager
+    def builder(self):
+        builder = self.acquire()
+        try:
+            yield builder
+        finally:
+            self.release(builder)
 
 
 # Usage Example
 builder = ComputerBuilder()
 computer = builder.add_cpu("Intel i9").add_gpu("NVIDIA RTX 4090").add_ram("64GB").build()
 print(computer)
+# computer.cpu = "Intel i3"  # ❌ AttributeError — a built Computer is immutable
+
+prototypes = ComputerPrototypes()
+prototypes.register("gaming", ComputerBuilder().add_cpu("Intel i9").add_gpu("NVIDIA RTX 4090").add_ram("64GB"))
+prototypes.register("office", ComputerBuilder().add_cpu("Intel i5").add_ram("16GB"))
+print(prototypes.get("gaming") is prototypes.get("gaming"))  # ✅ True — one shared instance
+print(prototypes.clone("office", ram="32GB"))
+for _ in range(1000):
+    prototypes.get("office")
+print(prototypes.stats)
+
+pool = ComputerBuilderPool(max_size=4)
+for i in range(1000):
+    with pool.builder() as pooled_builder:
+        pooled_builder.add_cpu("AMD Ryzen 9").add_ram(f"{2 ** (i % 4 + 3)}GB").build()
+print(pool.stats)  # 1 allocation, 999 reused
+
+
+# Before/after measurement: memory per instance and build throughput
+class DictComputer:  # ❌ the original dict-backed Computer, kept for comparison
+    def __init__(self):
+        self.cpu = None
+        self.gpu = None
+        self.ram = None
+
+def build_dict_computer(spec):
+    computer = DictComputer()
+    computer.cpu, computer.gpu, computer.ram = spec.get("cpu"), spec.get("gpu"), spec.get("ram")
+    return computer
+
+def measure_builds(label, make_computers, count):
+    started = perf_counter()
+    for _ in make_computers():
+        pass
+    elapsed = perf_counter() - started
+    tracemalloc.start()  # separate pass: tracing slows allocation down
+    built = list(make_computers())
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:>26}: {memory / count:6.1f} bytes per computer, "
+          f"{count / elapsed:9.0f} computers/s")
+    return built
+
+def benchmark_builders(count=20_000):
+    cpus, gpus, rams = ["Intel i9", "AMD Ryzen 9", "Apple M3"], ["NVIDIA RTX 4090", "AMD RX 7900"], ["32GB", "64GB"]
+    with tempfile.TemporaryDirectory() as workdir:
+        jsonl_path = os.path.join(workdir, "specs.jsonl")
+        csv_path = os.path.join(workdir, "specs.csv")
+        with open(jsonl_path, "w") as jsonl_file, open(csv_path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["cpu", "gpu", "ram"])
+            for i in range(count):
+                spec = [cpus[i % 3], gpus[i % 2], rams[i % 2]]
+                jsonl_file.write(json.dumps(dict(zip(("cpu", "gpu", "ram"), spec))) + "\n")
+                writer.writerow(spec)
+
+        def dict_computers():
+            with open(jsonl_path) as specs:
+                for line in specs:
+                    yield build_dict_computer(json.loads(line))
+
+        measure_builds("dict-backed, from JSONL", dict_computers, count)
+        measure_builds("__slots__ + intern, JSONL", lambda: iter_computers_from_jsonl(jsonl_path), count)
+        measure_builds("__slots__ + intern, CSV", lambda: iter_computers_from_csv(csv_path), count)
+
+# Only when run directly, so importing the module stays fast; pass a larger count for stabler numbers
+if __name__ == "__main__":
+    benchmark_builders()
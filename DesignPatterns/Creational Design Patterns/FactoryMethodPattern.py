@@ -6,6 +6,8 @@
 # وقتی نمی‌خوای کلاس اصلی بدونه دقیقاً چه نوع شیئی ساخته میشه، از Factory استفاده کن.
 # ============================================================
 
+from time import perf_counter
+
 class Shape:
     def draw(self):
         pass
@@ -18,7 +20,8 @@ class Square(Shape):
     def draw(self):
         print("Drawing a Square")
 
-class ShapeFactory:
+# ❌ Before — every new type means another elif, and every call allocates a new object
+class IfElseShapeFactory:
     def get_shape(self, shape_type):
         if shape_type == "circle":
             return Circle()
@@ -27,10 +30,74 @@ class ShapeFactory:
         else:
             return None
 
+# ✅ Registry — types register themselves, lookup is one dict access.
+# Stateless products are flyweights: one shared instance instead of a new one per call.
+# نوع جدید فقط ثبت میشه (بدون تغییر factory) و اشیاء بدون state یک بار ساخته و دوباره استفاده میشن.
+class ShapeFactory:
+    builtin_shapes = {"circle": Circle, "square": Square}  # available on every new factory
+
+    def __init__(self):
+        self._flyweights = {}  # shape_type -> shared instance
+        self._creators = {}  # shape_type -> class, for products that need a fresh instance
+        for shape_type, shape_class in self.builtin_shapes.items():
+            self.register(shape_type, shape_class)
+
+    def register(self, shape_type, shape_class, shared=True):
+        self.unregister(shape_type)
+        if shared:
+            self._flyweights[shape_type] = shape_class()
+        else:
+            self._creators[shape_type] = shape_class
+        return shape_class
+
+    def unregister(self, shape_type):
+        self._flyweights.pop(shape_type, None)
+        self._creators.pop(shape_type, None)
+
+    def get_shape(self, shape_type):
+        shape = self._flyweights.get(shape_type)
+        if shape is not None:
+            return shape
+        creator = self._creators.get(shape_type)
+        return creator() if creator is not None else None
+
+    def get_shapes(self, shape_types):
+        """Bulk version of get_shape for large batches."""
+        flyweights, get_shape = self._flyweights, self.get_shape
+        return [flyweights[t] if t in flyweights else get_shape(t) for t in shape_types]
+
 # Usage Example
-factory = ShapeFactory()
+factory = ShapeFactory()  # circle and square are built in
+
 shape1 = factory.get_shape("circle")
 shape2 = factory.get_shape("square")
 
 shape1.draw()
-shape2.draw()
\ No newline at end of file
+shape2.draw()
+print(factory.get_shape("circle") is shape1)  # ✅ True — same flyweight
+
+# Adding a type needs no change to the factory
+class Triangle(Shape):
+    def draw(self):
+        print("Drawing a Triangle")
+
+factory.register("triangle", Triangle)
+for shape in factory.get_shapes(["triangle", "circle"]):
+    shape.draw()
+
+
+# Benchmark — 10^6 creations with the old and the new factory
+def benchmark_factories(count=1_000_000):
+    shape_types = ["circle", "square"] * (count // 2)
+    old_factory = IfElseShapeFactory()
+    for label, create in (
+        ("if/elif get_shape", lambda: [old_factory.get_shape(t) for t in shape_types]),
+        ("registry get_shape", lambda: [factory.get_shape(t) for t in shape_types]),
+        ("registry get_shapes", lambda: factory.get_shapes(shape_types)),
+    ):
+        started = perf_counter()
+        create()
+        elapsed = perf_counter() - started
+        print(f"{label:>20}: {elapsed:.3f}s ({count / elapsed / 1e6:.1f}M shapes/s)")
+
+benchmark_factories()
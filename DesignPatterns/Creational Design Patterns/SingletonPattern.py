@@ -4,6 +4,15 @@
 # بعضی چیزها تو برنامه فقط باید یه دونه وجود داشته باشن — مثلاً تنظیمات (config)، دیتابیس، logger و غیره.
 # ============================================================
 
+import json
+import multiprocessing
+import os
+import struct
+import threading
+import timeit
+from multiprocessing import shared_memory
+from time import sleep
+
 class Singleton:
     _instance = None  # Holds the single instance
 
@@ -18,4 +27,227 @@ class Singleton:
 s1 = Singleton()
 s2 = Singleton()
 
-print(s1 is s2)  # ✅ True — both are the same instance
\ No newline at end of file
+print(s1 is s2)  # ✅ True — both are the same instance
+
+
+# ============================================================
+# 🧩 Thread-safe & fork-aware Singleton (metaclass)
+# The simple version above races: two threads can both see _instance is None
+# and each create an instance. SingletonMeta uses double-checked locking —
+# the lock is only taken while the instance is being created, steady-state
+# calls are a plain dict lookup.
+# نسخه‌ی بالا thread-safe نیست؛ اینجا فقط بار اول قفل می‌گیریم و بعدش بدون قفل برمی‌گردونیم.
+# بعد از fork هم process فرزند نسخه‌ی خودش رو می‌سازه، نه اینکه state پدر رو بی‌صدا share کنه.
+# ============================================================
+
+class SingletonMeta(type):
+    _instances = {}  # class -> its single instance
+    _lock = threading.RLock()  # re-entrant: one singleton's __init__ may use another
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            return SingletonMeta._instances[cls]  # fast path, no lock
+        except KeyError:
+            pass
+        with SingletonMeta._lock:
+            if cls not in SingletonMeta._instances:  # check again, another thread may have won
+                SingletonMeta._instances[cls] = super().__call__(*args, **kwargs)
+            return SingletonMeta._instances[cls]
+
+    # Classes can set `reset_on_fork = False` and define `after_fork(self)` to keep
+    # their instance in the child and only repair what fork() broke (locks, sockets...).
+    @staticmethod
+    def _after_fork_in_child():
+        SingletonMeta._lock = threading.RLock()  # might have been held by a thread that doesn't exist here
+        for cls, instance in list(SingletonMeta._instances.items()):
+            if getattr(cls, "reset_on_fork", True):
+                del SingletonMeta._instances[cls]  # recreated lazily on next access
+            elif hasattr(instance, "after_fork"):
+                instance.after_fork()
+
+    @staticmethod
+    def reset(cls=None):
+        """Drop one (or every) singleton instance, e.g. between tests."""
+        with SingletonMeta._lock:
+            if cls is None:
+                SingletonMeta._instances.clear()
+            else:
+                SingletonMeta._instances.pop(cls, None)
+
+
+if hasattr(os, "register_at_fork"):  # not available on Windows
+    os.register_at_fork(after_in_child=SingletonMeta._after_fork_in_child)
+
+
+# Lazy initialization of expensive resources: computed once on first access,
+# then stored on the instance so later reads skip the descriptor entirely.
+class lazy_property:
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.lock = threading.Lock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self.lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.func(instance)
+        return instance.__dict__[self.name]
+
+
+class AppConfig(metaclass=SingletonMeta):
+    def __init__(self):
+        print("Creating AppConfig...")
+        self.created_in = os.getpid()
+
+    @lazy_property
+    def settings(self):
+        print("Loading settings (expensive)...")
+        sleep(0.1)
+        return {"debug": False, "workers": 4}
+
+
+# Usage Example
+config1 = AppConfig()
+config2 = AppConfig()
+print(config1 is config2)  # ✅ True
+print(config1.settings)  # Loads once
+print(config2.settings)  # Already loaded
+
+# Concurrent first access creates exactly one instance
+class SlowService(metaclass=SingletonMeta):
+    instances_created = 0
+
+    def __init__(self):
+        sleep(0.05)  # widen the race window
+        SlowService.instances_created += 1
+
+start_line = threading.Barrier(32)
+def first_access():
+    start_line.wait()
+    SlowService()
+
+threads = [threading.Thread(target=first_access) for _ in range(32)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print("SlowService instances created:", SlowService.instances_created)  # ✅ 1
+
+# After fork() the child builds its own AppConfig instead of inheriting the parent's
+if hasattr(os, "fork"):
+    pid = os.fork()
+    if pid == 0:
+        print("Child has a fresh AppConfig:", AppConfig().created_in == os.getpid())  # ✅ True
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+
+# Benchmark — per-call access overhead once the instance exists
+def benchmark_singletons(number=1_000_000):
+    for label, access in (("Singleton (original __new__)", Singleton),
+                          ("SingletonMeta", AppConfig)):
+        seconds = timeit.timeit(access, number=number)
+        print(f"{label:>28}: {seconds / number * 1e9:6.1f} ns per call")
+
+benchmark_singletons()
+
+
+# ============================================================
+# 🧩 Shared-memory Singleton (one config for a whole process pool)
+# Instead of every worker loading and parsing the same big config, the parent
+# writes it once into multiprocessing.shared_memory and workers attach to it by name.
+# به جای اینکه هر worker کانفیگ رو جدا لود کنه، پدر یک بار توی shared memory می‌نویسه
+# و بقیه فقط به همون حافظه وصل میشن.
+#
+# Layout: [sequence: u64][length: u64][JSON payload ...]
+# Updates use a sequence lock: the parent makes the sequence odd, writes, then
+# makes it even again. Readers retry while it is odd or if it changed under them,
+# so they only ever see a complete version (version = sequence // 2).
+# ============================================================
+
+class SharedConfig(metaclass=SingletonMeta):
+    _header = struct.Struct("<QQ")
+
+    def __init__(self, name=None, config=None, capacity=None):
+        if name is None:  # the parent creates and owns the block
+            payload = json.dumps(config).encode()
+            capacity = capacity or max(2 * len(payload), 4096)  # room for updates to grow
+            self._shm = shared_memory.SharedMemory(create=True, size=self._header.size + capacity)
+            self.owner = True
+            self._write(payload)
+        else:  # workers attach to the existing block, no copy and no parsing of the source
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self._cached_version = None
+        self._cached_config = None
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def capacity(self):
+        return self._shm.size - self._header.size
+
+    @property
+    def version(self):
+        return self._header.unpack_from(self._shm.buf)[0] // 2
+
+    def get(self):
+        """Current config; decoded once per version and then reused."""
+        buf = self._shm.buf
+        while True:
+            sequence, length = self._header.unpack_from(buf)
+            if sequence % 2:
+                continue  # the parent is in the middle of an update
+            if sequence // 2 == self._cached_version:
+                return self._cached_config
+            payload = bytes(buf[self._header.size:self._header.size + length])
+            if self._header.unpack_from(buf)[0] == sequence:  # nothing changed while we copied
+                self._cached_version, self._cached_config = sequence // 2, json.loads(payload)
+                return self._cached_config
+
+    def update(self, config):
+        if not self.owner:
+            raise PermissionError("only the process that created the shared config can update it")
+        self._write(json.dumps(config).encode())
+
+    def _write(self, payload):
+        if len(payload) > self.capacity:
+            raise ValueError(f"config is {len(payload)} bytes, shared block holds {self.capacity}")
+        buf = self._shm.buf
+        sequence = self._header.unpack_from(buf)[0]
+        struct.pack_into("<Q", buf, 0, sequence + 1)  # odd: update in progress
+        buf[self._header.size:self._header.size + len(payload)] = payload
+        self._header.pack_into(buf, 0, sequence + 2, len(payload))  # even: new version visible
+
+    def close(self):
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+        SingletonMeta.reset(SharedConfig)
+
+
+def attach_shared_config(name):
+    SharedConfig(name)  # pool initializer: each worker attaches once
+
+
+def read_worker_setting(key):
+    config = SharedConfig()
+    return os.getpid(), config.version, config.get()[key]
+
+
+# Usage Example (guarded: spawn-based pools re-import this module in every worker)
+if __name__ == "__main__":
+    big_config = {"workers": 4, "feature_flags": {f"flag_{i}": i % 2 == 0 for i in range(20_000)}}
+    shared_config = SharedConfig(config=big_config)
+    print(f"Shared config: {len(json.dumps(big_config))} bytes in block {shared_config.name}")
+
+    with multiprocessing.Pool(4, initializer=attach_shared_config, initargs=(shared_config.name,)) as pool:
+        print("Workers see:", sorted(set(pool.map(read_worker_setting, ["workers"] * 8))))
+        shared_config.update({**big_config, "workers": 8})  # atomic, versioned update from the parent
+        print("After update:", sorted(set(pool.map(read_worker_setting, ["workers"] * 8))))
+
+    shared_config.close()
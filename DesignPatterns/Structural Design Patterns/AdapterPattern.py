@@ -6,6 +6,13 @@
 # ولی یکی از متدهاش اسم یا ساختار متفاوتی داره — Adapter به عنوان یه “مترجم” بینشون عمل می‌کنه.
 # ============================================================
 
+from time import perf_counter
+
+try:
+    import numpy as np
+except ImportError:  # only the bulk adapter needs NumPy
+    np = None
+
 class EuropeanSocket:
     def voltage(self): return 230
     def live(self): return 1
@@ -18,12 +25,14 @@ class USASocket:
 
 # Adapter connects a European device to a USA socket
 class EuropeanToUSAdapter:
+    US_VOLTAGE = 120
+
     def __init__(self, european_socket):
         self.socket = european_socket
 
     def voltage(self):
         # Convert 230V to 120V
-        return 120
+        return self.US_VOLTAGE
 
     def live(self):
         return self.socket.live()
@@ -34,4 +43,95 @@ class EuropeanToUSAdapter:
 # Usage Example
 euro_socket = EuropeanSocket()
 adapter = EuropeanToUSAdapter(euro_socket)
-print("Voltage after adaptation:", adapter.voltage())  # ✅ 120
\ No newline at end of file
+print("Voltage after adaptation:", adapter.voltage())  # ✅ 120
+
+
+# ============================================================
+# 🧩 Bulk (columnar) Adapter
+# Telemetry arrives as columns of readings, not one socket object at a time.
+# The bulk adapter converts whole NumPy arrays (or raw buffers) in one pass,
+# and its outputs are views — nothing is copied.
+# به جای تبدیل تک‌تک خوانش‌ها، کل ستون‌ها یک‌جا و بدون کپی تبدیل میشن.
+# ============================================================
+
+class BulkEuropeanToUSAdapter:
+    def __init__(self, voltage, live, neutral, dtype="int64"):
+        if np is None:
+            raise ImportError("the bulk adapter needs NumPy: pip install numpy")
+        self._voltage = self._column(voltage, dtype)
+        self._live = self._column(live, dtype)
+        self._neutral = self._column(neutral, dtype)
+
+    @staticmethod
+    def _column(data, dtype):
+        # bytes/bytearray/memoryview are raw telemetry buffers; arrays pass straight through
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            column = np.frombuffer(data, dtype=dtype)
+        else:
+            column = np.asarray(data)
+        view = column.view()
+        view.flags.writeable = False  # callers get views, so don't let them write through
+        return view
+
+    def __len__(self):
+        return len(self._voltage)
+
+    def voltage(self):
+        # Same rule as EuropeanToUSAdapter.voltage(), for every reading: a broadcast view, no allocation
+        return np.broadcast_to(np.asarray(EuropeanToUSAdapter.US_VOLTAGE, dtype=self._voltage.dtype),
+                               self._voltage.shape)
+
+    def live(self):
+        return self._live
+
+    def neutral(self):
+        return self._neutral
+
+
+# A socket with measured values, to compare the scalar and bulk paths on real-looking data
+class MeteredEuropeanSocket(EuropeanSocket):
+    def __init__(self, voltage, live, neutral):
+        self._readings = (voltage, live, neutral)
+
+    def voltage(self): return self._readings[0]
+    def live(self): return self._readings[1]
+    def neutral(self): return self._readings[2]
+
+
+def benchmark_adapters(count=100_000):
+    # Both paths adapt every reading and then use it (sum the three wires), so the
+    # bulk time covers real work on the data, not just creating the views
+    rng = np.random.default_rng(0)
+    voltages = rng.integers(220, 241, count)
+    lives = rng.integers(0, 2, count)
+    neutrals = -rng.integers(0, 2, count)
+
+    sockets = [MeteredEuropeanSocket(*reading) for reading in
+               zip(voltages.tolist(), lives.tolist(), neutrals.tolist())]
+    started = perf_counter()
+    scalar_total = sum(a.voltage() + a.live() + a.neutral() for a in map(EuropeanToUSAdapter, sockets))
+    scalar_time = perf_counter() - started
+
+    buffers = (voltages.tobytes(), lives.tobytes(), neutrals.tobytes())  # as they'd arrive off the wire
+    started = perf_counter()
+    bulk = BulkEuropeanToUSAdapter(*buffers)
+    bulk_total = int(bulk.voltage().sum() + bulk.live().sum() + bulk.neutral().sum())
+    bulk_time = perf_counter() - started
+
+    scalar = [(a.voltage(), a.live(), a.neutral()) for a in map(EuropeanToUSAdapter, sockets)]
+    assert np.array_equal(np.array(scalar), np.column_stack((bulk.voltage(), bulk.live(), bulk.neutral())))
+    assert scalar_total == bulk_total  # ✅ identical results
+    print(f"scalar adapter, adapt + sum: {count / scalar_time / 1e6:8.2f}M readings/s")
+    print(f"  bulk adapter, adapt + sum: {count / bulk_time / 1e6:8.2f}M readings/s")
+
+
+# Usage Example
+if np is not None:
+    live_column = np.array([1, 1, 0, 1])
+    bulk_adapter = BulkEuropeanToUSAdapter([230, 231, 229, 230], live_column, [-1, -1, 0, -1])
+    print("Bulk voltage after adaptation:", bulk_adapter.voltage())  # ✅ [120 120 120 120]
+    print("Live column is a view, not a copy:", np.shares_memory(bulk_adapter.live(), live_column))
+    if __name__ == "__main__":  # the benchmark only when run directly
+        benchmark_adapters()
+else:
+    print("NumPy is not installed — skipping the bulk adapter example")
@@ -7,23 +7,93 @@
 # اینجا Decorator وارد میشه.
 # ============================================================
 
+import json
+import os
+import tempfile
+from timeit import timeit
+
+try:
+    import numpy as np
+except ImportError:  # only the batch pricing engine needs NumPy
+    np = None
+
 class Coffee:
     def cost(self):
         return 5
 
-class MilkDecorator:
+# Every add-on just declares its price; the shared base class works out the total.
+# cost() walks the stack in a loop instead of recursing through every layer,
+# so a stack thousands of layers deep can't hit Python's recursion limit,
+# and the result is cached on the outer layer until some stack is rewired.
+# به جای recursion لایه‌به‌لایه، قیمت‌ها با یک حلقه جمع زده میشن و نتیجه cache میشه.
+class CoffeeDecorator:
+    price = 0
+    _epoch = 0  # bumped by rewrap(); every cached cost from an older epoch is stale
+
     def __init__(self, coffee):
         self._coffee = coffee
+        self._cost = None
+        self._cost_epoch = -1
+
+    def rewrap(self, coffee):
+        """Replace the wrapped beverage — invalidates every cached cost."""
+        self._coffee = coffee
+        CoffeeDecorator._epoch += 1
 
     def cost(self):
-        return self._coffee.cost() + 2
+        epoch = CoffeeDecorator._epoch
+        if self._cost_epoch == epoch:
+            return self._cost
+        total, layer = 0, self
+        while isinstance(layer, CoffeeDecorator):
+            # self is always priced flat: a subclass's cost() may build on super().cost()
+            if layer is not self:
+                if type(layer).cost is not CoffeeDecorator.cost:  # an inner layer with its own pricing logic
+                    total += layer.cost()  # (checked first: its cache holds only its super().cost() part)
+                    break
+                if layer._cost_epoch == epoch:  # an inner layer already knows its total
+                    total += layer._cost
+                    break
+            total += layer.price
+            layer = layer._coffee
+        else:
+            total += layer.cost()
+        self._cost, self._cost_epoch = total, epoch
+        return total
 
-class SugarDecorator:
-    def __init__(self, coffee):
-        self._coffee = coffee
+class MilkDecorator(CoffeeDecorator):
+    price = 2
+
+class SugarDecorator(CoffeeDecorator):
+    price = 1
+
+
+# A decorator stack compiled into a flat form: base cost + count of each add-on.
+# cost() is O(1); if any stack was rewired since compiling, it recompiles first.
+# A layer that overrides cost() is not a flat add-on: compiling stops there and
+# that layer (with everything under it) becomes the base, priced by its own cost().
+class CompiledCoffee:
+    def __init__(self, beverage):
+        self._source = beverage
+        self._compile()
+
+    def _compile(self):
+        add_ons, layer = {}, self._source
+        while isinstance(layer, CoffeeDecorator) and type(layer).cost is CoffeeDecorator.cost:
+            add_ons[type(layer)] = add_ons.get(type(layer), 0) + 1
+            layer = layer._coffee
+        self.base = layer
+        self.add_ons = add_ons  # decorator class -> how many layers of it
+        self._cost = layer.cost() + sum(cls.price * count for cls, count in add_ons.items())
+        self._epoch = CoffeeDecorator._epoch
 
     def cost(self):
-        return self._coffee.cost() + 1
+        if self._epoch != CoffeeDecorator._epoch:
+            self._compile()
+        return self._cost
+
+def compile_coffee(beverage):
+    return CompiledCoffee(beverage)
 
 # Usage Example
 coffee = Coffee()
@@ -33,4 +103,176 @@ milk_coffee = MilkDecorator(coffee)
 print("With Milk:", milk_coffee.cost())
 
 sweet_milk_coffee = SugarDecorator(milk_coffee)
-print("With Milk + Sugar:", sweet_milk_coffee.cost())
\ No newline at end of file
+print("With Milk + Sugar:", sweet_milk_coffee.cost())
+
+# A rebuilt stack is priced correctly, not from a stale cache
+sweet_milk_coffee.rewrap(coffee)  # now it's just Coffee + Sugar
+print("Rewired to Coffee + Sugar:", sweet_milk_coffee.cost())  # ✅ 6
+
+# An add-on with its own pricing logic still composes with flat ones
+class DoubleShotDecorator(CoffeeDecorator):
+    def cost(self):
+        return self._coffee.cost() * 2
+
+double_sweet = SugarDecorator(DoubleShotDecorator(MilkDecorator(Coffee())))
+print("Double shot of Milk Coffee + Sugar:", double_sweet.cost())  # ✅ 15
+assert compile_coffee(double_sweet).cost() == double_sweet.cost()
+
+# ...and so does one that extends the usual pricing with super()
+class CaramelDecorator(CoffeeDecorator):
+    price = 1
+
+    def cost(self):
+        return super().cost() + 0.5  # caramel drizzle on top
+
+caramel_latte = SugarDecorator(CaramelDecorator(MilkDecorator(Coffee())))
+print("Milk Coffee + Caramel + Sugar:", caramel_latte.cost())  # ✅ 9.5
+assert caramel_latte.cost() == compile_coffee(caramel_latte).cost() == 9.5
+
+
+# Benchmark — cost() at different stack depths
+def recursive_cost(beverage):
+    # ❌ how cost() used to work: one nested call per layer
+    if isinstance(beverage, CoffeeDecorator):
+        return recursive_cost(beverage._coffee) + beverage.price
+    return beverage.cost()
+
+def benchmark_decorators(depths=(10, 1_000, 100_000), number=100):
+    for depth in depths:
+        beverage = Coffee()
+        for i in range(depth):
+            beverage = MilkDecorator(beverage) if i % 2 else SugarDecorator(beverage)
+        try:
+            recursive = f"{timeit(lambda: recursive_cost(beverage), number=number) / number * 1e6:10.1f}µs"
+        except RecursionError:
+            recursive = f"{'RecursionError':>12}"
+        first_call = timeit(beverage.cost, number=1) * 1e6
+        cached = timeit(beverage.cost, number=number) / number * 1e6
+        compiled = compile_coffee(beverage)
+        flat = timeit(compiled.cost, number=number) / number * 1e6
+        print(f"depth {depth:>7}: recursive {recursive}, first cost() {first_call:10.1f}µs, "
+              f"cached {cached:5.2f}µs, compiled {flat:5.2f}µs (cost={compiled.cost()})")
+
+benchmark_decorators()
+
+
+# ============================================================
+# 🧩 Batch pricing (NumPy)
+# For large order streams, skip building decorator objects entirely:
+# an order is just "how many of each add-on", and the totals for a whole
+# chunk of orders are one matrix-vector product with the decorators' prices.
+# برای میلیون‌ها سفارش، به جای ساختن شیء برای هر سفارش، همه رو با یک ضرب برداری حساب می‌کنیم.
+# ============================================================
+
+ADD_ONS = {"milk": MilkDecorator, "sugar": SugarDecorator}  # column order of count arrays
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("batch pricing needs NumPy: pip install numpy")
+
+def _as_counts(values):
+    # int64 counts, refusing anything a plain cast would silently truncate (1.7 -> 1)
+    raw = np.asarray(values)
+    if raw.dtype.kind not in "iuf":
+        raise ValueError(f"add-on counts must be numbers, got {raw.dtype}")
+    if raw.dtype.kind == "f" and not np.isfinite(raw).all():
+        raise ValueError("add-on counts must be finite")
+    counts = raw.astype(np.int64)
+    if not np.array_equal(counts, raw):
+        raise ValueError("add-on counts must be whole numbers")
+    return counts
+
+def _is_count(value):
+    return (isinstance(value, int) and not isinstance(value, bool)) or (
+        isinstance(value, float) and value.is_integer())
+
+def price_orders(add_on_counts):
+    """Totals for many orders at once.
+
+    add_on_counts is either an (orders, len(ADD_ONS)) array of counts, columns in
+    ADD_ONS order, or a dict like {"milk": [...], "sugar": [...]}; add-ons missing
+    from the dict count as 0 for every order. Raises ValueError for unknown add-ons,
+    columns of different lengths, or counts that are negative or not whole numbers.
+    """
+    _require_numpy()
+    if isinstance(add_on_counts, dict):
+        unknown = add_on_counts.keys() - ADD_ONS.keys()
+        if unknown:
+            raise ValueError(f"unknown add-ons: {sorted(unknown)}")
+        columns = {name: _as_counts(column) for name, column in add_on_counts.items()}
+        lengths = {column.shape for column in columns.values()}
+        if len(lengths) != 1 or len(next(iter(lengths))) != 1:
+            raise ValueError("add-on counts must be 1-D columns of the same length")
+        orders = next(iter(lengths))[0]
+        counts = np.column_stack([columns.get(name, np.zeros(orders, dtype=np.int64)) for name in ADD_ONS])
+    else:
+        counts = _as_counts(add_on_counts)
+        if counts.ndim != 2 or counts.shape[1] != len(ADD_ONS):
+            raise ValueError(f"expected an (orders, {len(ADD_ONS)}) array of counts, got {counts.shape}")
+    if (counts < 0).any():
+        raise ValueError("add-on counts can't be negative")
+    prices = np.array([decorator.price for decorator in ADD_ONS.values()], dtype=np.int64)
+    return Coffee().cost() + counts @ prices
+
+def iter_order_totals(jsonl_path, chunk_size=100_000):
+    """Price a JSONL file of orders ({"milk": 2, "sugar": 1} per line) chunk by chunk.
+
+    Only one chunk of counts is in memory at a time, so the input can be any size.
+    """
+    _require_numpy()
+    names = list(ADD_ONS)
+    counts = np.zeros((chunk_size, len(names)), dtype=np.int64)  # reused for every chunk
+    filled = 0
+    with open(jsonl_path, encoding="utf-8") as orders:
+        for line in orders:
+            if not line.strip():
+                continue
+            order = json.loads(line)
+            if order.keys() - ADD_ONS.keys():
+                raise ValueError(f"unknown add-ons in order: {line.strip()}")
+            row = [order.get(name, 0) for name in names]
+            if not all(map(_is_count, row)):
+                raise ValueError(f"add-on counts must be whole numbers: {line.strip()}")
+            counts[filled] = row
+            filled += 1
+            if filled == chunk_size:
+                yield price_orders(counts)
+                filled = 0
+    if filled:
+        yield price_orders(counts[:filled])
+
+def write_order_totals(jsonl_path, output_path, chunk_size=100_000):
+    """Stream totals to a text file, one per line, in input order."""
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as output:
+        for totals in iter_order_totals(jsonl_path, chunk_size):
+            output.write("\n".join(map(str, totals.tolist())) + "\n")
+            written += len(totals)
+    return written
+
+
+# Usage Example
+if np is not None:
+    milk_counts = np.array([0, 1, 1, 3])
+    sugar_counts = np.array([0, 0, 1, 2])
+    print("Batch totals:", price_orders({"milk": milk_counts, "sugar": sugar_counts}))
+    print("Milk only:", price_orders({"milk": milk_counts}))  # ✅ missing sugar counts as 0
+
+    # Same prices as the decorator objects
+    for milk, sugar in zip(milk_counts.tolist(), sugar_counts.tolist()):
+        beverage = Coffee()
+        for _ in range(milk):
+            beverage = MilkDecorator(beverage)
+        for _ in range(sugar):
+            beverage = SugarDecorator(beverage)
+        assert beverage.cost() == price_orders([[milk, sugar]])[0]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        orders_path = os.path.join(workdir, "orders.jsonl")
+        with open(orders_path, "w") as orders_file:
+            for i in range(250_000):
+                orders_file.write(json.dumps({"milk": i % 3, "sugar": i % 2}) + "\n")
+        priced = write_order_totals(orders_path, os.path.join(workdir, "totals.txt"), chunk_size=50_000)
+        print(f"Priced {priced} orders from JSONL in chunks of 50,000")
+else:
+    print("NumPy is not installed — skipping the batch pricing example")
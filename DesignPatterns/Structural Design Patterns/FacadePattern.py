@@ -7,34 +7,416 @@
 # Facade مثل یه “واسط دوستانه” است که پشتش چندین کار انجام میشه.
 # ============================================================
 
+import hashlib
+import mmap
+import os
+import random
+import struct
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter, sleep
+
 class CPU:
+    position = None  # where the last jump went
+
     def freeze(self): print("Freezing CPU...")
-    def jump(self, position): print(f"Jumping to {position}...")
+    def jump(self, position):
+        print(f"Jumping to {position}...")
+        self.position = position
     def execute(self): print("Executing instructions...")
 
+# Memory and HardDrive also have a real block-storage mode:
+# the drive is a memory-mapped image file read as zero-copy memoryview slices,
+# and memory is one preallocated bytearray that load() writes into in place.
+# در حالت واقعی، دیسک یک فایل image با mmap هست و خوندن ازش کپی نمی‌سازه.
 class Memory:
-    def load(self, position, data):
-        print(f"Loading data {data} into position {position}...")
+    def __init__(self, size=None):
+        self._buffer = bytearray(size) if size else None
+
+    @property
+    def size(self):
+        return len(self._buffer) if self._buffer is not None else 0
+
+    def load(self, position, data, quiet=False):
+        if self._buffer is None or isinstance(data, str):
+            print(f"Loading data {data} into position {position}...")
+            return
+        end = position + len(data)
+        if position < 0 or end > len(self._buffer):
+            raise ValueError(f"{len(data)} bytes at {position} don't fit in {len(self._buffer)} bytes of memory")
+        if not quiet:
+            print(f"Loading {len(data)} bytes into position {position}...")
+        self._buffer[position:end] = data
+
+    def view(self, position=0, size=None):
+        end = len(self._buffer) if size is None else position + size
+        return memoryview(self._buffer)[position:end]
 
 class HardDrive:
+    def __init__(self, image_path=None, sector_size=512):
+        self.sector_size = sector_size
+        self.image_path = image_path
+        self._file = self._map = self._view = None
+        if image_path is not None:
+            self._file = open(image_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+
+    def identity(self):
+        """32 bytes that change whenever the image does (path, size, mtime) — for snapshots."""
+        if self._file is None:
+            return bytes(32)
+        info = os.fstat(self._file.fileno())
+        key = f"{os.path.realpath(self.image_path)}\0{info.st_size}\0{info.st_mtime_ns}"
+        return hashlib.sha256(key.encode()).digest()
+
+    @property
+    def sectors(self):
+        return len(self._map) // self.sector_size if self._map is not None else 0
+
     def read(self, lba, size):
-        return f"Data from sector {lba} (size {size})"
+        if self._view is None:
+            return f"Data from sector {lba} (size {size})"
+        start = lba * self.sector_size
+        if lba < 0 or start + size > len(self._view):
+            raise ValueError(f"read of {size} bytes at sector {lba} is past the end of the image")
+        return self._view[start:start + size]  # a view into the mapping, nothing is copied
+
+    def close(self):
+        # Views returned by read() keep the mapping alive: release them before closing
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._file.close()
+            self._file = self._map = self._view = None
+
+# A boot step: an action plus the steps it has to wait for.
+# The action gets the results of the steps that already finished.
+class BootStep:
+    def __init__(self, name, action, depends_on=()):
+        self.name = name
+        self.action = action
+        self.depends_on = tuple(depends_on)
+
+class StageTiming:
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start = start  # seconds since boot started
+        self.end = end
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+class BootReport:
+    def __init__(self, steps, timings):
+        self.timings = timings  # name -> StageTiming
+        self.total = max((t.end for t in timings.values()), default=0.0)
+        self.critical_path = self._critical_path(steps, timings)
+
+    @staticmethod
+    def _critical_path(steps, timings):
+        # Walk back from the step that finished last, always through the dependency
+        # that finished last — that chain is what actually decided the boot time.
+        if not timings:
+            return []
+        depends_on = {step.name: step.depends_on for step in steps}
+        name = max(timings, key=lambda n: timings[n].end)
+        path = [name]
+        while depends_on[name]:
+            name = max(depends_on[name], key=lambda n: timings[n].end)
+            path.append(name)
+        return path[::-1]
+
+    def __str__(self):
+        lines = [f"{'stage':>12} {'start':>8} {'took':>8}"]
+        for timing in sorted(self.timings.values(), key=lambda t: t.start):
+            lines.append(f"{timing.name:>12} {timing.start * 1000:6.1f}ms {timing.duration * 1000:6.1f}ms")
+        lines.append(f"total {self.total * 1000:.1f}ms, critical path: {' -> '.join(self.critical_path)}")
+        return "\n".join(lines)
+
+class SnapshotError(Exception):
+    pass
+
+class BootError(Exception):
+    def __init__(self, step, report):
+        super().__init__(f"boot step {step!r} failed")
+        self.step = step
+        self.report = report
 
 # Facade hides complexity
+# Only some boot steps really depend on each other, so the facade takes them as a
+# dependency graph and runs independent steps at the same time.
+# مراحلی که به هم وابسته نیستن همزمان اجرا میشن و زمان هر مرحله + مسیر بحرانی گزارش میشه.
+#
+# Warm start: with a snapshot_path (and a block-mode Memory), the first boot saves the
+# loaded memory image and CPU position; later boots restore them instead of reading
+# the drive again. A snapshot whose checksum doesn't match, or that was taken from a
+# different (or since modified) disk image, is ignored (cold boot).
+# بعد از اولین بوت، وضعیت حافظه و CPU ذخیره میشه و بوت‌های بعدی از همون snapshot شروع می‌کنن.
 class ComputerFacade:
-    def __init__(self):
+    _snapshot_header = struct.Struct("<8sqQ32s32s")  # magic, cpu position, image length, drive, sha256
+    _snapshot_fields = struct.Struct("<8sqQ32s")  # the part of the header covered by the sha256
+    _snapshot_magic = b"CFSNAP02"
+    _cold_steps = ("freeze", "read", "load")  # replaced by "restore" on a warm start
+
+    def __init__(self, steps=None, max_workers=4, memory=None, hard_drive=None, snapshot_path=None):
         self.cpu = CPU()
-        self.memory = Memory()
-        self.hard_drive = HardDrive()
+        self.memory = memory or Memory()
+        self.hard_drive = hard_drive or HardDrive()
+        self.max_workers = max_workers
+        self.steps = list(steps) if steps is not None else self.default_steps()
+        self.snapshot_path = snapshot_path
+        self.last_report = None
+        self.warm = False  # whether the last boot came from the snapshot
+
+    def default_steps(self):
+        return [
+            BootStep("freeze", lambda results: self.cpu.freeze()),
+            BootStep("read", lambda results: self.hard_drive.read(0, 100)),
+            BootStep("load", lambda results: self.memory.load(0, results["read"]), depends_on=("freeze", "read")),
+            BootStep("jump", lambda results: self.cpu.jump(0), depends_on=("load",)),
+            BootStep("execute", lambda results: self.cpu.execute(), depends_on=("jump",)),
+        ]
+
+    def add_step(self, step):
+        self.steps.append(step)
+        return self
 
     def start_computer(self):
         print("Starting computer...")
-        self.cpu.freeze()
-        data = self.hard_drive.read(0, 100)
-        self.memory.load(0, data)
-        self.cpu.jump(0)
-        self.cpu.execute()
+        position = self._snapshot_position()
+        self.warm = position is not None
+        if self.warm:
+            try:
+                self.last_report = self._run(self._warm_steps(position))
+                return self.last_report
+            except BootError as exc:
+                if not isinstance(exc.__cause__, SnapshotError):
+                    raise
+                print(f"{exc.__cause__}, booting cold...")
+                self.memory.view()[:] = bytes(self.memory.size)  # drop the half-restored image
+                self.warm = False
+        self.last_report = self._run(self.steps)
+        self._write_snapshot()
+        return self.last_report
+
+    def discard_snapshot(self):
+        """Force the next start to boot cold (a changed disk image already does)."""
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+
+    def _warm_steps(self, position):
+        warm = [BootStep("restore", lambda results: self._restore_snapshot(position))]
+        for step in self.steps:
+            if step.name in self._cold_steps:
+                continue
+            depends_on = tuple(dict.fromkeys("restore" if dep in self._cold_steps else dep
+                                             for dep in step.depends_on))
+            action = (lambda results: self.cpu.jump(position)) if step.name == "jump" else step.action
+            warm.append(BootStep(step.name, action, depends_on))
+        return warm
+
+    def _snapshot_enabled(self):
+        return self.snapshot_path is not None and self.memory.size > 0
+
+    def _write_snapshot(self):
+        if not self._snapshot_enabled() or self.cpu.position is None:
+            return
+        image = self.memory.view()
+        drive = self.hard_drive.identity()
+        header = self._snapshot_header.pack(self._snapshot_magic, self.cpu.position, len(image), drive,
+                                            self._snapshot_digest(self.cpu.position, drive, image))
+        partial = self.snapshot_path + ".tmp"
+        with open(partial, "wb") as snapshot:
+            snapshot.write(header)
+            snapshot.write(image)
+        os.replace(partial, self.snapshot_path)  # readers never see a half-written snapshot
+
+    def _snapshot_position(self):
+        # CPU position from a snapshot that fits this machine, or None to boot cold
+        if not self._snapshot_enabled() or not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, "rb") as snapshot:
+            header = snapshot.read(self._snapshot_header.size)
+        if len(header) != self._snapshot_header.size:
+            return None
+        magic, position, length, drive, _ = self._snapshot_header.unpack(header)
+        if magic != self._snapshot_magic or length != self.memory.size:
+            return None
+        if drive != self.hard_drive.identity():
+            print("Disk image changed since the snapshot, booting cold...")
+            return None
+        return position
+
+    def _snapshot_digest(self, position, drive, image):
+        # the header fields are hashed too, so a flipped CPU position is caught like a flipped byte
+        digest = hashlib.sha256(self._snapshot_fields.pack(self._snapshot_magic, position, len(image), drive))
+        digest.update(image)
+        return digest.digest()
+
+    def _restore_snapshot(self, position):
+        print("Restoring memory from snapshot...")
+        with open(self.snapshot_path, "rb") as snapshot:
+            _, saved_position, length, drive, digest = self._snapshot_header.unpack(
+                snapshot.read(self._snapshot_header.size))
+            image = self.memory.view()
+            if (saved_position != position or snapshot.readinto(image) != length
+                    or self._snapshot_digest(saved_position, drive, image) != digest):
+                raise SnapshotError("Snapshot checksum mismatch")
+
+    def _run(self, steps):
+        by_name = {step.name: step for step in steps}
+        waiting_on = {step.name: set(step.depends_on) for step in steps}
+        for name, deps in waiting_on.items():
+            unknown = deps - by_name.keys()
+            if unknown:
+                raise ValueError(f"boot step {name!r} depends on unknown steps {sorted(unknown)}")
+
+        results, timings, running = {}, {}, {}
+        boot_started = perf_counter()
+
+        def timed(step):
+            started = perf_counter() - boot_started
+            try:
+                return step.action(results)
+            finally:
+                timings[step.name] = StageTiming(step.name, started, perf_counter() - boot_started)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while waiting_on or running:
+                for name in [n for n, deps in waiting_on.items() if not deps]:
+                    del waiting_on[name]
+                    running[pool.submit(timed, by_name[name])] = name
+                if not running:
+                    raise ValueError(f"boot steps form a cycle: {sorted(waiting_on)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        wait(running)  # let steps already started finish before reporting
+                        raise BootError(name, BootReport(steps, timings)) from future.exception()
+                    results[name] = future.result()
+                    for deps in waiting_on.values():
+                        deps.discard(name)
+        return BootReport(steps, timings)
 
 # Usage Example
 computer = ComputerFacade()
 computer.start_computer()
+
+# Many subsystems: declare what waits on what, and independent ones boot in parallel
+def slow(label, seconds):
+    def action(results):
+        sleep(seconds)  # simulate a subsystem taking time to come up
+        return label
+    return action
+
+server = ComputerFacade(max_workers=8)
+server.add_step(BootStep("gpu", slow("gpu", 0.20)))
+server.add_step(BootStep("network", slow("network", 0.15)))
+server.add_step(BootStep("disks", slow("disks", 0.30)))
+server.add_step(BootStep("services", slow("services", 0.10), depends_on=("execute", "network", "disks")))
+print(server.start_computer())  # ~0.4s instead of the 0.75s it takes one after another
+
+
+# Block storage: boot from a real image file
+def make_image(path, size):
+    with open(path, "wb") as image:
+        image.write(b"BOOT" + bytes(range(96)))  # a tiny "boot sector" at the start
+        image.truncate(size)  # the rest is sparse
+
+with tempfile.TemporaryDirectory() as workdir:
+    image_path = os.path.join(workdir, "disk.img")
+    make_image(image_path, 1024 * 1024)
+    drive = HardDrive(image_path)
+    ram = Memory(64 * 1024)
+    ComputerFacade(memory=ram, hard_drive=drive).start_computer()
+    print("First bytes in memory:", bytes(ram.view(0, 4)))  # ✅ b'BOOT'
+    drive.close()
+
+
+# Benchmark — sequential and random reads from an image into memory.
+# Pass a multi-GB image_size to measure a real disk; the default keeps the example quick.
+def benchmark_block_storage(image_size=32 * 1024 * 1024, block_size=1024 * 1024,
+                            random_reads=10_000, random_size=4096, directory=None):
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        image_path = os.path.join(workdir, "bench.img")
+        with open(image_path, "wb") as image:
+            chunk = os.urandom(block_size)
+            for _ in range(image_size // block_size):
+                image.write(chunk)
+        drive = HardDrive(image_path, sector_size=512)
+        ram = Memory(block_size)
+
+        started = perf_counter()
+        for lba in range(0, drive.sectors, block_size // drive.sector_size):
+            ram.load(0, drive.read(lba, block_size), quiet=True)
+        elapsed = perf_counter() - started
+        print(f"sequential: {image_size / elapsed / 1e9:6.2f} GB/s ({block_size // 1024} KiB blocks)")
+
+        rng = random.Random(0)
+        last_lba = drive.sectors - random_size // drive.sector_size
+        lbas = [rng.randrange(last_lba) for _ in range(random_reads)]
+        started = perf_counter()
+        for lba in lbas:
+            ram.load(0, drive.read(lba, random_size), quiet=True)
+        elapsed = perf_counter() - started
+        print(f"    random: {random_reads / elapsed:9.0f} reads/s ({random_size // 1024} KiB each)")
+        drive.close()
+
+# Only when run directly; pass a larger image_size (e.g. 256 MiB) to get past the page cache
+if __name__ == "__main__":
+    benchmark_block_storage()
+
+
+# Warm start — cold boot once, then restore from the snapshot
+class SpinningHardDrive(HardDrive):
+    def read(self, lba, size):
+        sleep(0.2)  # seek + spin-up of a slow disk
+        return super().read(lba, size)
+
+with tempfile.TemporaryDirectory() as workdir:
+    image_path = os.path.join(workdir, "disk.img")
+    make_image(image_path, 1024 * 1024)
+    snapshot_path = os.path.join(workdir, "boot.snapshot")
+    timings = {}
+    for attempt in ("cold", "warm"):
+        drive = SpinningHardDrive(image_path)
+        pc = ComputerFacade(memory=Memory(16 * 1024 * 1024), hard_drive=drive, snapshot_path=snapshot_path)
+        started = perf_counter()
+        pc.start_computer()
+        timings["warm" if pc.warm else "cold"] = perf_counter() - started
+        assert bytes(pc.memory.view(0, 4)) == b"BOOT" and pc.cpu.position == 0
+        drive.close()
+    print(f"Cold start: {timings['cold'] * 1000:.1f}ms, warm start: {timings['warm'] * 1000:.1f}ms")
+    print(pc.last_report)
+
+    # A corrupted snapshot is detected and the machine boots cold instead
+    with open(snapshot_path, "r+b") as snapshot:
+        snapshot.seek(ComputerFacade._snapshot_header.size)
+        snapshot.write(b"XXXX")
+    drive = SpinningHardDrive(image_path)
+    pc = ComputerFacade(memory=Memory(16 * 1024 * 1024), hard_drive=drive, snapshot_path=snapshot_path)
+    pc.start_computer()
+    assert not pc.warm and bytes(pc.memory.view(0, 4)) == b"BOOT"
+    drive.close()
+
+    # ...and so is a tampered header field: the digest covers the CPU position too
+    with open(snapshot_path, "r+b") as snapshot:
+        snapshot.seek(8)  # just past the magic
+        snapshot.write(struct.pack("<q", 7))
+    drive = SpinningHardDrive(image_path)
+    pc = ComputerFacade(memory=Memory(16 * 1024 * 1024), hard_drive=drive, snapshot_path=snapshot_path)
+    pc.start_computer()
+    assert not pc.warm and pc.cpu.position == 0
+    drive.close()
+
+    # A new disk image invalidates the snapshot on its own — no discard_snapshot() needed
+    with open(image_path, "r+b") as image:
+        image.write(b"BEEP")
+    drive = SpinningHardDrive(image_path)
+    pc = ComputerFacade(memory=Memory(16 * 1024 * 1024), hard_drive=drive, snapshot_path=snapshot_path)
+    pc.start_computer()
+    assert not pc.warm and bytes(pc.memory.view(0, 4)) == b"BEEP"  # ✅ the new image, not the snapshot
+    drive.close()
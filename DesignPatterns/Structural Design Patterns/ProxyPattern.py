@@ -9,36 +9,340 @@
 # در این حالت، یه کلاس Proxy می‌سازی که رفتار اصلی رو کنترل یا محدود می‌کنه.
 # ============================================================
 
-from time import sleep
+import asyncio
+import http.client
+import json
+import os
+import pickle
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+from time import monotonic, perf_counter, sleep, time
 
 # The real object that does the heavy work
 class YouTubeVideo:
+    load_delay = 1  # seconds of simulated network loading
+
     def __init__(self, video_id):
         self.video_id = video_id
         self._load_from_server()
 
     def _load_from_server(self):
         print(f"Loading video {self.video_id} from YouTube server...")
-        sleep(1)  # simulate heavy network loading
+        sleep(self.load_delay)  # simulate heavy network loading
         print("Video loaded successfully.")
 
     def play(self):
         print(f"Playing video {self.video_id}...")
 
 
+# Counters the cache keeps while it runs — read them to size the cache from real data
+# با این شمارنده‌ها می‌تونی اندازه‌ی مناسب کش رو از روی داده‌ی واقعی انتخاب کنی
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.coalesced = 0  # misses that waited on another caller's in-flight load
+        self.load_time = 0.0  # total seconds spent loading from the server
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def avg_load_latency(self):
+        return self.load_time / self.loads if self.loads else 0.0
+
+    def __str__(self):
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, "
+                f"hit_rate={self.hit_rate:.0%}, evictions={self.evictions}, "
+                f"expirations={self.expirations}, loads={self.loads}, "
+                f"coalesced={self.coalesced}, "
+                f"avg_load_latency={self.avg_load_latency:.3f}s)")
+
+
+# Approximate memory of an object *and* everything it references (attributes,
+# container items), counting shared objects once. sys.getsizeof alone is shallow:
+# a YouTubeVideo would measure the same 56 bytes whatever its video_id holds.
+def deep_sizeof(obj, _seen=None):
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+# Bounded cache: LRU eviction by entry count and/or memory budget, plus TTL expiry.
+# max_bytes is compared against size_of(value) summed over the entries — by default
+# deep_sizeof, i.e. the value plus what it references, not the key or cache bookkeeping.
+class LRUCache:
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None,
+                 size_of=deep_sizeof, clock=monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # seconds an entry stays valid, None = forever
+        self._size_of = size_of
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, size, expires_at), oldest first
+        self.current_bytes = 0
+        self.stats = CacheStats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        if self._expired(entry):
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)  # mark as most recently used
+        self.stats.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        if key in self._entries:
+            self._remove(key)
+        size = self._size_of(value)
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, size, expires_at)
+        self.current_bytes += size
+        self._evict()
+
+    def record_load(self, seconds):
+        self.stats.loads += 1
+        self.stats.load_time += seconds
+
+    def _expired(self, entry):
+        expires_at = entry[2]
+        return expires_at is not None and self._clock() >= expires_at
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _evict(self):
+        # Drop least recently used entries until both limits hold again
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats.evictions += 1
+
+
+# Optional second tier on local disk (sqlite), so a restarted process reads
+# its working set from disk instead of the server.
+# WAL mode lets several worker processes read at the same time while one writes;
+# every process (and thread) opens its own connection.
+# Only point this at a directory you trust — values are stored with pickle.
+# Hits don't write: last_access updates are buffered in memory and flushed in one
+# transaction once touch_batch entries are pending, on the next put (before eviction)
+# and on close().
+class DiskCache:
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, filename="videos.sqlite3",
+                 touch_batch=256):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        self.stats = CacheStats()
+        self._local = threading.local()
+        self._touch_lock = threading.Lock()
+        self._touched = {}  # key -> last access time not yet written to disk
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():  # never reuse a connection across fork()
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def get(self, key):
+        # A read or unpickle failure is a miss: this tier is only a cache
+        try:
+            row = self._connection().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            value = pickle.loads(row[0]) if row is not None else None
+        except Exception as exc:  # sqlite3.Error, a corrupt or outdated pickle, ...
+            print(f"[DiskCache] Can't read {key!r}, treating it as a miss: {exc!r}")
+            row = None
+        if row is None:
+            self.stats.misses += 1
+            return None
+        with self._touch_lock:
+            self._touched[key] = time()
+            pending = len(self._touched)
+        if pending >= self.touch_batch:
+            try:
+                self.flush()
+            except sqlite3.Error as exc:  # access times only steer eviction; keep serving
+                print(f"[DiskCache] Can't record access times: {exc!r}")
+        self.stats.hits += 1
+        return value
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        db = self._connection()
+        with db:
+            self._write_touches(db)  # eviction must see recent hits
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time()),
+            )
+            self._evict(db)
+
+    def flush(self):
+        db = self._connection()
+        with db:
+            self._write_touches(db)
+
+    def close(self):
+        self.flush()
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    def _write_touches(self, db):
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            db.executemany("UPDATE entries SET last_access = ? WHERE key = ?",
+                           [(accessed, key) for key, accessed in touched.items()])
+
+    def _evict(self, db):
+        # Size-based eviction: drop least recently used rows until we fit the budget
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
 # The Proxy object
+# Thread-safe: concurrent misses for the same id share one in-flight load (single-flight),
+# while loads for different ids run in parallel — the lock only guards the bookkeeping.
+# اگه چند thread همزمان یه ویدیوی کش‌نشده رو بخوان، فقط یک بار از سرور لود میشه
 class YouTubeProxy:
-    def __init__(self):
-        self._cache = {}  # cache loaded videos
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, video_factory=YouTubeVideo,
+                 disk_cache=None, size_of=deep_sizeof):
+        self._cache = LRUCache(max_entries, max_bytes, ttl, size_of)  # cache loaded videos
+        self._video_factory = video_factory
+        self._disk_cache = disk_cache  # optional DiskCache behind the in-memory tier
+        self._lock = threading.Lock()  # never held while loading
+        self._inflight = {}  # video_id -> Future of the load in progress
+
+    @property
+    def stats(self):
+        return self._cache.stats
+
+    def get_video(self, video_id):
+        video, _ = self._get_or_load(video_id)
+        return video
 
     def play_video(self, video_id):
         # Check if video already loaded (cached)
-        if video_id not in self._cache:
-            print(f"[Proxy] Video not in cache, loading...")
-            self._cache[video_id] = YouTubeVideo(video_id)
-        else:
+        video, source = self._get_or_load(video_id, announce=True)
+        if source == "cache":
             print(f"[Proxy] Playing cached video...")
-        self._cache[video_id].play()
+        video.play()
+
+    def _get_or_load(self, video_id, announce=False):
+        with self._lock:
+            video = self._cache.get(video_id)
+            if video is not None:
+                return video, "cache"
+            future = self._inflight.get(video_id)
+            leader = future is None
+            if leader:
+                future = self._inflight[video_id] = Future()
+            else:
+                self._cache.stats.coalesced += 1
+        if not leader:
+            if announce:
+                print(f"[Proxy] Video is already loading, waiting...")
+            return future.result(), "coalesced"
+
+        started = None
+        try:
+            video = self._disk_cache.get(video_id) if self._disk_cache is not None else None
+            if video is not None:
+                if announce:
+                    print(f"[Proxy] Video found in disk cache...")
+            else:
+                if announce:
+                    print(f"[Proxy] Video not in cache, loading...")
+                started = perf_counter()
+                video = self._video_factory(video_id)
+                elapsed = perf_counter() - started
+                if self._disk_cache is not None:
+                    self._save_to_disk(video_id, video)
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[video_id]
+            future.set_exception(exc)  # waiters see the same error; the next call retries
+            raise
+        with self._lock:
+            if started is not None:
+                self._cache.record_load(elapsed)
+            self._cache.put(video_id, video)
+            del self._inflight[video_id]
+        future.set_result(video)
+        return video, "loaded"
+
+    def _save_to_disk(self, video_id, video):
+        # The disk tier is optional: a locked database, a full disk or an unpicklable
+        # video must not fail a request for a video we already have in hand
+        try:
+            self._disk_cache.put(video_id, video)
+        except Exception as exc:
+            print(f"[Proxy] Couldn't write {video_id} to the disk cache: {exc!r}")
 
 
 # Usage Example
@@ -48,6 +352,419 @@ print("---")
 proxy.play_video("abc123")  # Plays from cache
 print("---")
 proxy.play_video("xyz789")  # Loads a new video
+print(proxy.stats)
+
+# Bounded cache — only the most recently played video survives
+bounded_proxy = YouTubeProxy(max_entries=1, ttl=60)
+bounded_proxy.play_video("abc123")
+bounded_proxy.play_video("xyz789")  # Evicts abc123
+bounded_proxy.play_video("xyz789")  # Plays from cache
+print(bounded_proxy.stats)
+
+# Stress test — many threads asking for the same few ids load each id exactly once
+class CountingVideo(YouTubeVideo):
+    load_delay = 0.2
+    load_counts = {}
+    _counts_lock = threading.Lock()
+
+    def _load_from_server(self):
+        with self._counts_lock:
+            self.load_counts[self.video_id] = self.load_counts.get(self.video_id, 0) + 1
+        sleep(self.load_delay)
+
+stress_proxy = YouTubeProxy(video_factory=CountingVideo)
+video_ids = [f"video{i}" for i in range(8)]
+started = perf_counter()
+with ThreadPoolExecutor(max_workers=64) as pool:
+    list(pool.map(stress_proxy.get_video, video_ids * 50))  # 400 requests
+elapsed = perf_counter() - started
+print(f"Loads per id: {CountingVideo.load_counts}")
+print(f"400 requests for 8 ids took {elapsed:.2f}s (one load is {CountingVideo.load_delay}s)")
+print(stress_proxy.stats)
+assert CountingVideo.load_counts == {video_id: 1 for video_id in video_ids}  # ✅ one load per id
+
+# Two-tier cache — a "restarted" proxy reads its working set from disk, not the server
+with tempfile.TemporaryDirectory(prefix="youtube-proxy-") as cache_dir:
+    first_disk = DiskCache(cache_dir, max_bytes=1024 * 1024)
+    first_run = YouTubeProxy(disk_cache=first_disk)
+    first_run.play_video("abc123")  # Loads from server, writes through to disk
+    first_disk.close()
+    print("--- restart ---")
+    second_disk = DiskCache(cache_dir, max_bytes=1024 * 1024)
+    second_run = YouTubeProxy(disk_cache=second_disk)
+    second_run.play_video("abc123")  # Reads from disk, no server load
+    second_disk.close()
+    print(second_run.stats)  # loads=0
+
+
+# ============================================================
+# 🧩 Async Proxy (asyncio)
+# The same caching proxy for event-loop based services: a cold video
+# only suspends the coroutine that asked for it, not the whole loop.
+# لود ویدیو در asyncio فقط همون درخواست رو منتظر می‌ذاره، نه کل event loop رو.
+# با prefetch می‌تونی ویدیوهای بعدی playlist رو از قبل در پس‌زمینه لود کنی.
+# ============================================================
+
+class AsyncYouTubeVideo:
+    load_delay = 1  # seconds of simulated network loading
+
+    def __init__(self, video_id):
+        self.video_id = video_id
+
+    @classmethod
+    async def load(cls, video_id):
+        video = cls(video_id)
+        await video._load_from_server()
+        return video
+
+    async def _load_from_server(self):
+        print(f"Loading video {self.video_id} from YouTube server...")
+        await asyncio.sleep(self.load_delay)  # simulate heavy network loading
+        print("Video loaded successfully.")
+
+    def play(self):
+        print(f"Playing video {self.video_id}...")
+
+
+class AsyncYouTubeProxy:
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None,
+                 max_concurrent_loads=8, max_prefetch_loads=None,
+                 video_factory=AsyncYouTubeVideo.load, size_of=deep_sizeof):
+        self._cache = LRUCache(max_entries, max_bytes, ttl, size_of)
+        self._video_factory = video_factory
+        self.max_concurrent_loads = max_concurrent_loads
+        # Prefetching never takes every load slot, so a cache miss on demand
+        # always has one free and costs a single load latency
+        self.max_prefetch_loads = (max(1, max_concurrent_loads // 2)
+                                   if max_prefetch_loads is None else max_prefetch_loads)
+        self._load_slots = None  # created on first use, inside the running loop
+        self._inflight = {}  # video_id -> Task of the load in progress
+        self._prefetch_queue = deque()
+        # Strong references to the running workers: the loop only keeps weak ones,
+        # so an unreferenced task could be garbage-collected mid-prefetch
+        self._prefetch_workers = set()
+
+    @property
+    def stats(self):
+        return self._cache.stats
+
+    async def get_video(self, video_id):
+        video = self._cache.get(video_id)
+        if video is not None:
+            return video
+        task = self._inflight.get(video_id)
+        if task is not None:
+            self._cache.stats.coalesced += 1
+        else:
+            task = self._start_load(video_id)
+        # shield: a cancelled caller must not cancel a load others are waiting on
+        return await asyncio.shield(task)
+
+    async def play_video(self, video_id):
+        if video_id in self._cache:
+            print(f"[AsyncProxy] Playing cached video...")
+        video = await self.get_video(video_id)
+        video.play()
+
+    def prefetch(self, video_ids):
+        """Warm the cache in the background for ids expected to be played next."""
+        for video_id in video_ids:
+            if (video_id not in self._cache and video_id not in self._inflight
+                    and video_id not in self._prefetch_queue):
+                self._prefetch_queue.append(video_id)
+        # a finished worker stays in the set until its done-callback runs; don't count it
+        running = sum(not worker.done() for worker in self._prefetch_workers)
+        while running < min(self.max_prefetch_loads, len(self._prefetch_queue)):
+            running += 1
+            worker = asyncio.get_running_loop().create_task(self._prefetch_worker())
+            self._prefetch_workers.add(worker)
+            worker.add_done_callback(self._prefetch_workers.discard)
+
+    async def _prefetch_worker(self):
+        while self._prefetch_queue:
+            video_id = self._prefetch_queue.popleft()
+            if video_id in self._cache or video_id in self._inflight:
+                continue  # already played or loading on demand
+            try:
+                await self._start_load(video_id)
+            except Exception as exc:
+                print(f"[AsyncProxy] Prefetch of {video_id} failed: {exc!r}")
+
+    def _start_load(self, video_id):
+        task = asyncio.get_running_loop().create_task(self._load(video_id))
+        self._inflight[video_id] = task
+        return task
+
+    async def _load(self, video_id):
+        if self._load_slots is None:
+            self._load_slots = asyncio.Semaphore(self.max_concurrent_loads)
+        try:
+            async with self._load_slots:
+                started = perf_counter()
+                video = await self._video_factory(video_id)
+                self._cache.record_load(perf_counter() - started)
+            self._cache.put(video_id, video)
+            return video
+        finally:
+            del self._inflight[video_id]
+
+
+# Usage Example
+async def watch_playlist(playlist):
+    async_proxy = AsyncYouTubeProxy(max_concurrent_loads=4)
+    started = perf_counter()
+    async_proxy.prefetch(playlist[1:])  # warm the rest while the first one plays
+    for video_id in playlist:
+        await async_proxy.play_video(video_id)
+        await asyncio.sleep(0.1)  # watch it for a bit
+    elapsed = perf_counter() - started
+    print(f"Played {len(playlist)} videos in {elapsed:.2f}s "
+          f"(one load is {AsyncYouTubeVideo.load_delay}s)")
+    print(async_proxy.stats)
+
+AsyncYouTubeVideo.load_delay = 0.3
+asyncio.run(watch_playlist(["intro", "part1", "part2", "part3", "outro"]))
+
+
+# ============================================================
+# 🧩 Remote Proxy (HTTP)
+# The proxy talks to a real server over HTTP instead of sleeping:
+# a bounded pool of keep-alive connections, plus batched multi-id fetches.
+# Remote Proxy نماینده‌ی یک شیء روی سرور دیگه‌ست؛ هزینه‌ی اصلی اینجا ساختن اتصال (handshake) و رفت‌وبرگشت‌هاست،
+# پس اتصال‌ها رو نگه می‌داریم (keep-alive) و چند ویدیو رو با یک درخواست می‌گیریم.
+# ============================================================
+
+class RemoteYouTubeVideo:
+    def __init__(self, video_id, payload):
+        self.video_id = video_id
+        self.payload = payload
+
+    def play(self):
+        print(f"Playing remote video {self.video_id} ({len(self.payload)} bytes)...")
+
+
+# Local stand-in for the video server, for tests and benchmarks.
+#   GET /videos/<id>              -> raw payload (id percent-encoded)
+#   GET /videos?ids=a&ids=b&ids=c -> {"a": "...", "b": "...", "c": "..."}
+# handshake_delay simulates the cost of opening a connection (TCP + TLS in real life).
+class LocalVideoServer:
+    def __init__(self, host="127.0.0.1", port=0, payload_size=1024,
+                 handshake_delay=0.005, request_delay=0.0):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive unless the client says otherwise
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                sleep(server.handshake_delay)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                sleep(server.request_delay)
+                url = urlsplit(self.path)
+                if url.path == "/videos":
+                    ids = parse_qs(url.query, keep_blank_values=True).get("ids", [])
+                    body = json.dumps({i: server.payload_for(i) for i in ids}).encode()
+                    self._reply(200, body, "application/json")
+                elif url.path.startswith("/videos/"):
+                    self._reply(200, server.payload_for(unquote(url.path[len("/videos/"):])).encode(),
+                                "application/octet-stream")
+                else:
+                    self._reply(404, b"not found", "text/plain")
+
+            def _reply(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output readable
+
+        self.payload_size = payload_size
+        self.handshake_delay = handshake_delay
+        self.request_delay = request_delay
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def payload_for(self, video_id):
+        return (video_id * (self.payload_size // max(len(video_id), 1) + 1))[:self.payload_size]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+# Bounded pool of HTTP/1.1 connections: at most max_size are open at once,
+# idle ones are reused (keep-alive), broken ones are dropped.
+class ConnectionPool:
+    def __init__(self, endpoint, max_size=4, timeout=10, keep_alive=True):
+        url = urlsplit(endpoint)
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.opened = 0  # connections created over the pool's lifetime
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = queue.LifoQueue()  # most recently used first — least likely to be stale
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+                self.opened += 1
+            try:
+                yield conn, reused
+            except BaseException:
+                conn.close()
+                raise
+            if self.keep_alive:
+                self._idle.put(conn)
+            else:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RemoteProxyError(Exception):
+    pass
+
+
+class RemoteYouTubeProxy:
+    def __init__(self, endpoint, pool_size=4, batch_size=50, keep_alive=True,
+                 max_entries=None, ttl=None):
+        self._pool = ConnectionPool(endpoint, pool_size, keep_alive=keep_alive)
+        self.batch_size = batch_size
+        self._cache = LRUCache(max_entries, ttl=ttl, size_of=lambda video: len(video.payload))
+        self._lock = threading.Lock()  # guards the cache only, never held during I/O
+
+    @property
+    def stats(self):
+        return self._cache.stats
+
+    def get_video(self, video_id):
+        with self._lock:
+            video = self._cache.get(video_id)
+        if video is None:
+            started = perf_counter()
+            payload = self._request(f"/videos/{quote(video_id, safe='')}").decode()
+            video = self._store(video_id, payload, perf_counter() - started)
+        return video
+
+    def get_videos(self, video_ids):
+        """Fetch many videos, asking the server for the missing ones in batches."""
+        with self._lock:
+            found = {video_id: self._cache.get(video_id) for video_id in video_ids}
+        missing = [video_id for video_id, video in found.items() if video is None]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            started = perf_counter()
+            query = urlencode({"ids": batch}, doseq=True)  # one ids= per id: ids may contain ","
+            payloads = json.loads(self._request(f"/videos?{query}"))
+            elapsed = (perf_counter() - started) / len(batch)
+            for video_id in batch:
+                found[video_id] = self._store(video_id, payloads[video_id], elapsed)
+        return [found[video_id] for video_id in video_ids]
+
+    def play_video(self, video_id):
+        self.get_video(video_id).play()
+
+    def close(self):
+        self._pool.close()
+
+    def _store(self, video_id, payload, load_time):
+        video = RemoteYouTubeVideo(video_id, payload)
+        with self._lock:
+            self._cache.record_load(load_time)
+            self._cache.put(video_id, video)
+        return video
+
+    def _request(self, path):
+        headers = {} if self._pool.keep_alive else {"Connection": "close"}
+        for attempt in range(2):
+            with self._pool.connection() as (conn, reused):
+                try:
+                    conn.request("GET", path, headers=headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    if reused and attempt == 0:
+                        conn.close()
+                        continue  # the server dropped an idle keep-alive connection, retry on a fresh one
+                    raise
+            if response.status != 200:
+                raise RemoteProxyError(f"GET {path} failed with HTTP {response.status}")
+            return body
+
+
+def benchmark_remote_proxy(requests=400, threads=8):
+    with LocalVideoServer(handshake_delay=0.002) as server:
+        for label, options in (("per-request connections", {"keep_alive": False}),
+                               ("pooled keep-alive", {"keep_alive": True})):
+            remote = RemoteYouTubeProxy(server.endpoint, pool_size=threads, **options)
+            connections_before = server.connections
+            started = perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(remote.get_video, (f"{label}-{i}" for i in range(requests))))
+            elapsed = perf_counter() - started
+            remote.close()
+            print(f"{label:>24}: {requests / elapsed:8.0f} videos/s, "
+                  f"{server.connections - connections_before} connections")
+
+        remote = RemoteYouTubeProxy(server.endpoint, pool_size=threads, batch_size=50)
+        requests_before = server.requests
+        started = perf_counter()
+        remote.get_videos([f"batch-{i}" for i in range(requests)])
+        elapsed = perf_counter() - started
+        remote.close()
+        print(f"{'batched (50 per request)':>24}: {requests / elapsed:8.0f} videos/s, "
+              f"{server.requests - requests_before} requests")
+
+
+# Usage Example
+with LocalVideoServer(payload_size=64) as video_server:
+    remote_proxy = RemoteYouTubeProxy(video_server.endpoint, pool_size=2)
+    remote_proxy.play_video("abc123")  # Fetched over HTTP
+    remote_proxy.play_video("abc123")  # Served from the proxy's cache
+    for remote_video in remote_proxy.get_videos(["abc123", "xyz789", "qwe456"]):  # One batched request
+        remote_video.play()
+    remote_proxy.close()
+    print(f"Server saw {video_server.requests} requests over {video_server.connections} connection(s)")
+
+benchmark_remote_proxy()
 
 
 #در دنیای واقعی، چند نوع Proxy داریم:
@@ -9,4 +9,19 @@ class Dog:
 dog1 = Dog("Bob", "Golden Retriever")
 dog1.bark()
 dog2 = Dog("Luna", "Husky")
-dog2.bark()
\ No newline at end of file
+dog2.bark()
+
+# __slots__: fixed attributes, no per-object __dict__ — much smaller when you have millions of dogs
+class SlottedDog:
+    __slots__ = ("name", "breed")
+
+    def __init__(self, name, breed):
+        self.name = name
+        self.breed = breed
+
+    def bark(self):
+        print(f"{self.name} says woof!")
+
+dog3 = SlottedDog("Max", "Beagle")
+dog3.bark()
+# dog3.age = 3  # ❌ AttributeError — only name and breed are allowed
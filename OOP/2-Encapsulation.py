@@ -1,18 +1,282 @@
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+from time import perf_counter
+
 class BankAccount:
     def __init__(self, name, balance):
         self.name = name
         self.__balance = balance # Private attribute (cannot be accessed directly)
+        self.__lock = threading.Lock() # += is read-modify-write: without a lock, concurrent deposits get lost
 
     def deposit(self, amount):
-        self.__balance += amount # Modify the private value safely
+        with self.__lock:
+            self.__balance += amount # Modify the private value safely
 
     def withdraw(self, amount):
-        self.__balance -= amount
+        with self.__lock:
+            self.__balance -= amount
 
     def get_balance(self):
         return self.__balance # Public method to access private data
 
-account = BankAccount("Bob", "100")
+account = BankAccount("Bob", 100)
 print(account.name)
 # print(acc.__balance)    # ❌ Error: 'BankAccount' object has no attribute '__balance'
-print(account.get_balance())
\ No newline at end of file
+print(account.get_balance())
+
+
+# Ledger — many accounts, still encapsulated (balances are private).
+# Accounts are spread over sharded locks so unrelated accounts never wait on each other,
+# and every change is written to an append-only journal the balances can be rebuilt from.
+# هر تغییر اول توی journal ثبت میشه؛ با replay کردن journal موجودی‌ها دوباره ساخته میشن.
+class JournalError(Exception):
+    pass
+
+
+class Journal:
+    # Group commit: operations append records to a buffer, one writer thread writes
+    # whatever has piled up with a single write + fsync, then wakes everyone it covered.
+    # One JSON array per line, so any account name and any int/float amount round-trips.
+    # If a write or fsync fails, every waiter (and every later append) gets a JournalError.
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self.commits = 0  # fsync'd groups written so far
+        self._file = open(path, "a", encoding="utf-8")
+        self._pending = []
+        self._appended = 0  # sequence number of the last appended record
+        self._durable = 0  # ... and of the last one safely on disk
+        self._closed = False
+        self._error = None  # what stopped the writer, if anything
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(target=self._write_groups, daemon=True)
+        self._writer.start()
+
+    def append(self, *fields):
+        record = json.dumps(fields) + "\n"
+        with self._cond:
+            self._check()
+            self._pending.append(record)
+            self._appended += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def wait_durable(self, sequence):
+        with self._cond:
+            while self._durable < sequence:
+                self._check()
+                self._cond.wait()
+
+    def _check(self):
+        if self._error is not None:
+            raise JournalError(f"journal {self.path!r} failed") from self._error
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+    def _write_groups(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                group, self._pending = self._pending, []
+                last = self._appended
+            try:
+                self._file.write("".join(group))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except Exception as exc:  # disk full, I/O error...: fail the waiters instead of hanging them
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = last
+                self.commits += 1
+                self._cond.notify_all()
+
+
+class InsufficientFunds(ValueError):
+    pass
+
+
+class Ledger:
+    def __init__(self, journal_path, shards=64, fsync=True):
+        if journal_path and os.path.exists(journal_path) and os.path.getsize(journal_path):
+            raise ValueError(f"{journal_path!r} already has records: use Ledger.reopen()")
+        self.__balances = {}
+        self.__shards = [threading.Lock() for _ in range(shards)]
+        self.__journal = Journal(journal_path, fsync) if journal_path else None
+
+    def __shard(self, name):
+        return hash(name) % len(self.__shards)
+
+    def __record(self, *fields):
+        # called with the account's shard lock(s) held, so the journal order matches the apply order,
+        # and before the change is applied, so once the journal has failed no further change is made
+        return self.__journal.append(*fields) if self.__journal else 0
+
+    def __commit(self, sequence):
+        if self.__journal:
+            self.__journal.wait_durable(sequence)  # after releasing the locks: no lock is held during fsync
+
+    @staticmethod
+    def __check_amount(amount, allow_zero=False):
+        # a negative deposit/withdrawal/transfer would move money the wrong way past every check
+        if (isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount)
+                or amount < 0 or (amount == 0 and not allow_zero)):
+            kind = "a non-negative" if allow_zero else "a positive"
+            raise ValueError(f"Amount must be {kind} finite number, got {amount!r}")
+
+    def open_account(self, name, balance=0):
+        self.__check_amount(balance, allow_zero=True)
+        with self.__shards[self.__shard(name)]:
+            if name in self.__balances:
+                raise ValueError(f"Account {name!r} already exists")
+            sequence = self.__record("open", name, balance)
+            self.__balances[name] = balance
+        self.__commit(sequence)
+
+    def deposit(self, name, amount):
+        self.__check_amount(amount)
+        with self.__shards[self.__shard(name)]:
+            self.__balances[name]  # unknown account: KeyError before anything is journaled
+            sequence = self.__record("deposit", name, amount)
+            self.__balances[name] += amount
+        self.__commit(sequence)
+
+    def withdraw(self, name, amount):
+        self.__check_amount(amount)
+        with self.__shards[self.__shard(name)]:
+            if self.__balances[name] < amount:
+                raise InsufficientFunds(f"Insufficient funds in {name!r}")
+            sequence = self.__record("withdraw", name, amount)
+            self.__balances[name] -= amount
+        self.__commit(sequence)
+
+    def transfer(self, source, target, amount):
+        self.__check_amount(amount)
+        # Lock both shards, always lowest index first, so two opposite transfers can't deadlock
+        first, *second = sorted({self.__shard(source), self.__shard(target)})
+        with self.__shards[first], (self.__shards[second[0]] if second else _no_lock):
+            if self.__balances[source] < amount:
+                raise InsufficientFunds(f"Insufficient funds in {source!r}")
+            self.__balances[target]  # unknown account: KeyError before anything is journaled
+            sequence = self.__record("transfer", source, target, amount)
+            self.__balances[source] -= amount
+            self.__balances[target] += amount
+        self.__commit(sequence)
+
+    def get_balance(self, name):
+        return self.__balances[name]
+
+    def total(self):
+        return sum(self.__balances.values())
+
+    def close(self):
+        if self.__journal:
+            self.__journal.close()
+
+    @property
+    def commits(self):
+        return self.__journal.commits if self.__journal else 0
+
+    @classmethod
+    def replay(cls, journal_path, shards=64):
+        """Rebuild balances from a journal (read-only: the result doesn't write a journal)."""
+        ledger = cls(None, shards)
+        ledger.__load(journal_path)
+        return ledger
+
+    @classmethod
+    def reopen(cls, journal_path, shards=64, fsync=True):
+        """Rebuild balances from an existing journal and keep journaling to it."""
+        ledger = cls(None, shards)
+        os.truncate(journal_path, ledger.__load(journal_path))  # new records must not follow a torn one
+        ledger.__journal = Journal(journal_path, fsync)
+        return ledger
+
+    def __load(self, journal_path):
+        # applies every complete record; returns how many bytes of the file they cover
+        balances, complete = self.__balances, 0
+        with open(journal_path, "rb") as journal:
+            for line in journal:
+                if not line.endswith(b"\n"):
+                    break  # torn last record from a crash: it was never acknowledged
+                op, *fields = json.loads(line)
+                if op == "open":
+                    balances[fields[0]] = fields[1]
+                elif op == "deposit":
+                    balances[fields[0]] += fields[1]
+                elif op == "withdraw":
+                    balances[fields[0]] -= fields[1]
+                elif op == "transfer":
+                    balances[fields[0]] -= fields[2]
+                    balances[fields[1]] += fields[2]
+                complete += len(line)
+        return complete
+
+
+class _NoLock:
+    def __enter__(self): return self
+    def __exit__(self, *exc_info): return False
+
+_no_lock = _NoLock()
+
+
+# Stress test — concurrent transfers never lose or create money, and the journal replays exactly
+def run_transfers(ledger, names, transfers, threads):
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(transfers // threads):
+            source, target = rng.sample(names, 2)
+            try:
+                ledger.transfer(source, target, rng.randint(1, 50))
+            except InsufficientFunds:
+                pass
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    started = perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return perf_counter() - started
+
+with tempfile.TemporaryDirectory() as workdir:
+    names = [f"account-{i}" for i in range(200)]
+    for threads in (1, 2, 4, 8, 16):
+        journal_path = os.path.join(workdir, f"ledger-{threads}.journal")
+        ledger = Ledger(journal_path)
+        for name in names:
+            ledger.open_account(name, 1000)
+        elapsed = run_transfers(ledger, names, 4000, threads)
+        ledger.close()
+        assert ledger.total() == 1000 * len(names)  # ✅ nothing lost
+        rebuilt = Ledger.replay(journal_path)
+        assert all(rebuilt.get_balance(name) == ledger.get_balance(name) for name in names)  # ✅ journal replays exactly
+        print(f"{threads:>2} threads: {4000 / elapsed:7.0f} transfers/s, {ledger.commits} group commits")
+
+    # Names with tabs/newlines and float amounts survive the journal; a reopened ledger keeps journaling
+    journal_path = os.path.join(workdir, "reopen.journal")
+    ledger = Ledger(journal_path)
+    ledger.open_account("Alice\tSmith", 10.5)
+    ledger.open_account("Bob\nJones")
+    ledger.transfer("Alice\tSmith", "Bob\nJones", 0.25)
+    ledger.close()
+    ledger = Ledger.reopen(journal_path)
+    ledger.deposit("Bob\nJones", 1.5)
+    ledger.close()
+    rebuilt = Ledger.replay(journal_path)
+    assert (rebuilt.get_balance("Alice\tSmith"), rebuilt.get_balance("Bob\nJones")) == (10.25, 1.75)
+    print("Reopened ledger:", rebuilt.get_balance("Alice\tSmith"), rebuilt.get_balance("Bob\nJones"))
@@ -16,4 +16,30 @@ class Cat(Animal):
 cat = Cat("Lucy")
 cat.speak()
 dog = Dog("Bob")
-dog.speak()
\ No newline at end of file
+dog.speak()
+
+# __slots__ with inheritance: the parent declares the attributes,
+# children add `__slots__ = ()` so they don't bring a __dict__ back
+class SlottedAnimal:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def speak(self):
+        print("Animal makes sound")
+
+class SlottedDog(SlottedAnimal):
+    __slots__ = ()
+
+    def speak(self):
+        print(f"{self.name} makes sound")
+
+class SlottedCat(SlottedAnimal):
+    __slots__ = ()
+
+    def speak(self):
+        print(f"{self.name} makes sound")
+
+SlottedCat("Milo").speak()
+SlottedDog("Rex").speak()
@@ -1,3 +1,10 @@
+import contextlib
+import io
+import itertools
+import tracemalloc
+from array import array
+from time import perf_counter
+
 class Animal(object):
     def __init__(self, name):
         self.name = name
@@ -16,3 +23,132 @@ class Cat(Animal):
 animals = [Dog("Rocky"), Cat("Luna")]
 for a in animals:
     a.speak()  # Each object runs its own version of speak()
+
+
+# __slots__ versions — same output, no per-object __dict__
+# (the base must declare __slots__ too: inheriting from Animal would bring the __dict__ back).
+# Each type's line is a format string, so speak_batch() can voice a whole group at once.
+class SlottedAnimal:
+    __slots__ = ("name",)
+    sound = "{}I am an animal"
+
+    def __init__(self, name):
+        self.name = name
+    def speak(self):
+        print(self.sound.format(self.name))
+
+    @classmethod
+    def speak_batch(cls, names):
+        # Polymorphism for a whole group at once: one call per type, not per animal
+        if cls.speak is not SlottedAnimal.speak:
+            # a subclass with its own speak(): honour it, one animal at a time
+            with contextlib.redirect_stdout(io.StringIO()) as spoken:
+                for name in names:
+                    cls(name).speak()
+            return spoken.getvalue().splitlines()
+        return list(map(cls.sound.format, names))
+
+class SlottedDog(SlottedAnimal):
+    __slots__ = ()
+    sound = "{} I am a dog"
+
+class SlottedCat(SlottedAnimal):
+    __slots__ = ()
+    sound = "{} I am a cat"
+
+
+# Columnar container: instead of millions of objects, keep one column per attribute
+# (names, breeds) and a compact type-tag column. Batch operations are dispatched
+# once per type to that type's speak_batch() (so kinds are the slotted classes).
+# به جای میلیون‌ها شیء، ستون‌ها رو نگه می‌داریم و عملیات رو برای هر نوع یک بار صدا می‌زنیم.
+class AnimalTable:
+    slotted_kinds = {Animal: SlottedAnimal, Dog: SlottedDog, Cat: SlottedCat}  # plain class -> its kind
+
+    def __init__(self, kinds=(SlottedDog, SlottedCat)):
+        self.kinds = list(kinds)  # tag -> class
+        self._tags_of = {kind: tag for tag, kind in enumerate(self.kinds)}
+        self.names = []
+        self.breeds = []
+        self.tags = array("B")  # one byte per animal
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, kind, name, breed=None):
+        self.tags.append(self._tags_of[kind])
+        self.names.append(name)
+        self.breeds.append(breed)
+
+    @classmethod
+    def from_objects(cls, animals, kinds=(SlottedDog, SlottedCat)):
+        table = cls(kinds)
+        for animal in animals:
+            kind = cls.slotted_kinds.get(type(animal), type(animal))
+            table.append(kind, animal.name, getattr(animal, "breed", None))
+        return table
+
+    def _mask(self, kind):
+        # bytes.translate + itertools.compress keep the per-row work in C
+        tag = self._tags_of[kind]
+        table = bytes(1 if value == tag else 0 for value in range(256))
+        return self.tags.tobytes().translate(table)
+
+    def names_of(self, kind):
+        return list(itertools.compress(self.names, self._mask(kind)))
+
+    def count_by_kind(self):
+        tags = self.tags.tobytes()
+        return {kind: tags.count(tag) for tag, kind in enumerate(self.kinds)}
+
+    def speak_all(self):
+        """Every animal's line, grouped by type (all dogs, then all cats, ...)."""
+        lines = []
+        for kind in self.kinds:
+            lines.extend(kind.speak_batch(self.names_of(kind)))
+        return lines
+
+    def speak(self):
+        print("\n".join(self.speak_all()))
+
+
+table = AnimalTable()
+table.append(SlottedDog, "Rocky", "Boxer")
+table.append(SlottedCat, "Luna")
+table.append(SlottedDog, "Bella", "Poodle")
+table.speak()
+AnimalTable.from_objects(animals).speak()  # ✅ the plain Dog/Cat list from above works too
+
+
+# Benchmark — memory and speak() throughput: list of objects vs slotted objects vs table
+def benchmark_animals(count=300_000):
+    names = [f"animal-{i}" for i in range(count)]  # shared by every layout, so not counted below
+
+    def build_table():
+        animal_table = AnimalTable()
+        for i, name in enumerate(names):
+            animal_table.append(SlottedDog if i % 2 else SlottedCat, name)
+        return animal_table
+
+    layouts = [
+        ("list of objects", lambda: [Dog(n) if i % 2 else Cat(n) for i, n in enumerate(names)]),
+        ("__slots__ objects", lambda: [SlottedDog(n) if i % 2 else SlottedCat(n) for i, n in enumerate(names)]),
+        ("AnimalTable", build_table),
+    ]
+    for label, build in layouts:
+        tracemalloc.start()
+        population = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = perf_counter()
+            if isinstance(population, AnimalTable):
+                for line in population.speak_all():  # one print per animal, like the objects
+                    print(line)
+            else:
+                for a in population:
+                    a.speak()
+            elapsed = perf_counter() - started
+        print(f"{label:>18}: {memory / count:6.1f} bytes per animal, {count / elapsed / 1e6:5.2f}M speak()/s")
+
+benchmark_animals()
@@ -11,6 +11,16 @@
 # D - Dependency Inversion
 # ============================================================
 
+import base64
+import csv
+import io
+import os
+import smtplib
+import socketserver
+import tempfile
+import threading
+import tracemalloc
+
 
 # ============================================================
 # 1️⃣ S - Single Responsibility Principle (SRP)
@@ -31,24 +41,196 @@ class Report:
         print("Sending via email...")
 
 # ✅ Good Example — Split responsibilities into separate classes
+# Each class also has a streaming form: the report is produced as chunks and
+# every stage handles one chunk at a time, so memory stays flat for any report size.
+# The stages stay independent: the file is saved completely first, and the email
+# streams the saved file — so a mail server being down can't stop the save.
 class Report:
+    def __init__(self, title="report", rows=()):
+        self.title = title
+        self.rows = rows  # any iterable of rows — can be a generator
+
     def generate(self):
         print("Generating report...")
 
+    def chunks(self, chunk_size=64 * 1024):
+        """Yield the report as CSV bytes, roughly chunk_size at a time."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in self.rows:
+            writer.writerow(row)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
 class FileSaver:
     def save(self, report):
         print("Saving report to file...")
 
+    def save_stream(self, chunks, path, buffer_size=1024 * 1024):
+        """Write chunks to path as they arrive; returns the number of bytes written."""
+        written = 0
+        with open(path, "wb", buffering=buffer_size) as file:
+            for chunk in chunks:
+                file.write(chunk)
+                written += len(chunk)
+        return written
+
+    def read_stream(self, path, chunk_size=64 * 1024):
+        """Yield a saved file back in chunks, e.g. for EmailSender.send_stream()."""
+        with open(path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
 class EmailSender:
+    def __init__(self, host="localhost", port=25, sender="reports@example.com"):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
     def send(self, report):
         print("Sending report via email...")
 
+    def send_stream(self, chunks, recipient, filename, subject="Report"):
+        """Send chunks as a base64 attachment, encoding and sending them as they arrive."""
+        boundary = "==report-boundary=="
+        with smtplib.SMTP(self.host, self.port) as smtp:
+            smtp.ehlo()
+            code, reply = smtp.mail(self.sender)
+            if code != 250:
+                raise smtplib.SMTPSenderRefused(code, reply, self.sender)
+            code, reply = smtp.rcpt(recipient)
+            if code not in (250, 251):
+                raise smtplib.SMTPRecipientsRefused({recipient: (code, reply)})
+            code, reply = smtp.docmd("DATA")
+            if code != 354:
+                raise smtplib.SMTPDataError(code, reply)
+            smtp.send(
+                f"From: {self.sender}\r\nTo: {recipient}\r\nSubject: {subject}\r\n"
+                f"MIME-Version: 1.0\r\nContent-Type: multipart/mixed; boundary=\"{boundary}\"\r\n\r\n"
+                f"--{boundary}\r\nContent-Type: text/plain\r\n\r\nReport attached.\r\n"
+                f"--{boundary}\r\nContent-Type: text/csv\r\nContent-Transfer-Encoding: base64\r\n"
+                f"Content-Disposition: attachment; filename=\"{filename}\"\r\n\r\n"
+            )
+            carry = b""  # base64 lines hold 57 input bytes; keep the remainder for the next chunk
+            for chunk in chunks:
+                data = carry + chunk
+                whole = len(data) - len(data) % 57
+                if whole:
+                    smtp.send(base64.encodebytes(data[:whole]).replace(b"\n", b"\r\n"))
+                carry = data[whole:]
+            if carry:
+                smtp.send(base64.encodebytes(carry).replace(b"\n", b"\r\n"))
+            smtp.send(f"--{boundary}--\r\n.\r\n")  # base64 lines never start with ".", no dot-stuffing needed
+            code, reply = smtp.getreply()
+            if code != 250:
+                raise smtplib.SMTPDataError(code, reply)
+
+# Local SMTP stand-in for trying the email classes without a real mail server.
+# It only counts what it receives, so it doesn't hold whole messages in memory.
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), LocalSMTPHandler)
+        self.messages = []  # (sender, recipients, size in bytes)
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+class LocalSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        with self.server.lock:
+            self.server.sessions += 1
+        sender, recipients = None, []
+        self.reply("220 localhost stand-in SMTP ready")
+        for line in self.rfile:
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                sender, recipients = command[10:].strip("<>"), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command[8:].strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for data_line in self.rfile:
+                    if data_line == b".\r\n":
+                        break
+                    size += len(data_line)
+                with self.server.lock:
+                    self.server.messages.append((sender, recipients, size))
+                self.reply("250 OK: queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
 # Usage Example
 report = Report()
 report.generate()
 FileSaver().save(report)
 EmailSender().send(report)
 
+# Streaming pipeline: Report -> FileSaver, then saved file -> EmailSender, one chunk at a time
+def sales_rows(count):
+    yield ("order_id", "customer", "amount")
+    for i in range(count):
+        yield (i, f"customer-{i % 1000}", f"{i % 97 * 1.25:.2f}")
+
+def stream_report(rows, workdir, smtp_port):
+    tracemalloc.start()
+    try:
+        report_path = os.path.join(workdir, "sales.csv")
+        saver = FileSaver()
+        saver.save_stream(Report("sales", sales_rows(rows)).chunks(), report_path)
+        EmailSender(port=smtp_port).send_stream(saver.read_stream(report_path), "boss@example.com",
+                                                "sales.csv", subject="Sales report")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    print(f"{rows:>9} rows: {os.path.getsize(report_path) / 1e6:6.1f} MB report, "
+          f"peak memory {peak / 1e6:.2f} MB")
+
+with tempfile.TemporaryDirectory() as workdir:
+    with LocalSMTPServer() as smtp_server:
+        for rows in (10_000, 30_000, 100_000):
+            stream_report(rows, workdir, smtp_server.port)
+        print(f"SMTP stand-in received {len(smtp_server.messages)} messages")
+
+    # With the mail server gone the email fails, but the report is still saved
+    os.remove(os.path.join(workdir, "sales.csv"))
+    try:
+        stream_report(1_000, workdir, smtp_server.port)
+    except OSError as exc:
+        print(f"Email failed ({type(exc).__name__}), report saved anyway:",
+              os.path.exists(os.path.join(workdir, "sales.csv")))  # ✅ True
+
 
 
 # ============================================================